@@ -11,6 +11,7 @@ import newspaper as np
 import faker
 
 import gn_modules.misc as gn_misc
+import gn_modules.rate_limiter as gn_rate_limiter
 from gn_modules.category import Category
 
 logger = logging.getLogger('genderednews.article')
@@ -152,9 +153,14 @@ class Article():
         return self
 
     def get_text(self) -> str:
-        """Method that downloads the text of the article if not present and returns it."""
+        """
+        Method that downloads the text of the article if not present and returns it.
+        The downloads are rate limited per domain (see DomainRateLimiter).
+        """
 
         if self._text is None:
+            # Only the downloads are throttled: an article whose text is known is returned at once
+            gn_rate_limiter.download_rate_limiter.acquire(self.link)
             art = np.Article(self.link, language='fr')
             art.download()
             try:
@@ -5,9 +5,11 @@ The DbHelper class.
 
 import os
 import sys
+import json
 import logging
 import typing
 import datetime as dt
+import bson
 import pymongo as pm
 import sshtunnel
 
@@ -22,6 +24,9 @@ import gn_modules.scraping_and_extraction.config_collectors as gn_config_collect
 logger = logging.getLogger('genderednews.db_helper')
 logger_debug = logging.getLogger('genderednews_debug.db_helper')
 
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RE_EXTRACT_CHECKPOINT_FILE = os.path.join(PROJECT_ROOT, 'cache', 're_extract_checkpoint.json')
+
 
 class SingletonMeta(type):
     """
@@ -203,6 +208,18 @@ class DbHelper(metaclass=SingletonMeta):
         res = self.articles_collection.find_one(article)
         return res
 
+    def get_existing_links(self, links: typing.List[str], batch_size: int = 1000) -> typing.Set[str]:
+        """Return the subset of the given links that are already stored in the database.
+        The links are looked up by batches of batch_size links."""
+
+        existing_links = set()
+        for i in range(0, len(links), batch_size):
+            raw_articles = self.articles_collection.find(
+                {'link': {'$in': links[i:i + batch_size]}}, {'link': True, '_id': False})
+            existing_links.update(raw_article['link']
+                                  for raw_article in raw_articles)
+        return existing_links
+
     def get_articles_never_processed(self, n_max_articles: int) -> typing.List[gn_article.Article]:
         """Return a list of len <= n_max_articles articles
         that has never been processed."""
@@ -341,39 +358,108 @@ class DbHelper(metaclass=SingletonMeta):
         logger.info('Database sanity check finished.')
         logger_debug.info('Database sanity check finished.')
 
-    def re_extract_and_process_everything(self):
+    def re_extract_and_process_everything(self, from_archive: bool = False, batch_size: int = 100,
+                                          checkpoint_file: str = RE_EXTRACT_CHECKPOINT_FILE, resume: bool = True):
         """re-extract and re-process every articles in the database.
         For the reprocessing to work, the articles link, date and source_name must be correct.
+        If from_archive is True, the html of the articles is read from the html archive of the collectors
+        instead of being downloaded (the articles that have not been archived are skipped).
+        The articles are handled by batches of batch_size articles (in the order of their _id), each batch
+        is re-extracted, re-processed and updated before the next one is read so that the memory use stays flat.
+        The _id of the last updated article is saved in checkpoint_file: if resume is True, a crashed run
+        starts again after this article. The checkpoint file is removed once every article has been handled.
         """
 
-        raw_articles = list(self.articles_collection.find())
+        last_id = self._read_checkpoint(checkpoint_file) if resume else None
+        if last_id is not None:
+            logger.info(f'Resuming after article {last_id}.')
+
+        logger.info(
+            f'{self.articles_collection.count_documents({})} articles found.')
+
+        processings = [processing()
+                       for processing in gn_config_processing.processings]
+        collectors = {}
+        n_articles = 0
+        while True:
+            # A new query per batch: a single cursor would time out during long batches
+            query = {'_id': {'$gt': last_id}} if last_id is not None else {}
+            raw_articles = list(self.articles_collection.find(
+                query, {'_id': True, 'link': True, 'date': True, 'source_name': True}
+            ).sort('_id', pm.ASCENDING).limit(batch_size))
+            if not raw_articles:
+                break
+
+            articles = self._re_extract_articles(
+                raw_articles, collectors, from_archive)
+            for processing in processings:
+                try:
+                    articles = processing.apply_on(articles)
+
+                    logger.info(
+                        f'{processing.name} processing re-applied on {len(articles)} articles.')
+                except:
+                    logger.exception(f'{processing.name} processing failed.')
+            self.update_articles(articles)
+
+            n_articles += len(articles)
+            last_id = raw_articles[-1]['_id']
+            self._write_checkpoint(checkpoint_file, last_id)
+            logger.info(
+                f'{n_articles} articles re-extracted and re-processed so far (last article: {last_id}).')
+
+        if os.path.isfile(checkpoint_file):
+            os.remove(checkpoint_file)
+        logger.info(
+            f'{n_articles} articles re-extracted and re-processed.')
 
-        logger.info(f'{len(raw_articles)} articles found.')
+    def _re_extract_articles(self, raw_articles: typing.List[typing.Dict], collectors: typing.Dict[str, gn_collector.Collector],
+                             from_archive: bool) -> typing.List[gn_article.Article]:
+        """Re-extract raw articles (link, date and source_name) with the collector of their source.
+        The collectors are instanciated once per source and kept in collectors."""
 
         articles = []
         for raw_article in raw_articles:
             try:
-                collector: gn_collector.Collector = gn_config_collector.collectors[raw_article['source_name']](
-                )
+                source_name = raw_article['source_name']
+                if source_name not in collectors:
+                    collectors[source_name] = gn_config_collector.collectors[source_name](
+                        scraping_mode="rss")
+                collector: gn_collector.Collector = collectors[source_name]
+                html = None
+                if from_archive:
+                    html = collector.archive.get(raw_article['link'])
+                    if html is None:
+                        logger.warning(
+                            f'{raw_article["link"]} not found in the html archive.')
+                        continue
                 article = collector.create_article_from_link(
-                    raw_article['link'], raw_article['date'])
+                    raw_article['link'], raw_article['date'], html=html)
 
                 logger.info(f'{article.link} re-extracted.')
             except:
                 logger.exception(f'{raw_article["link"]} extraction failed.')
                 continue
             articles.append(article)
+        return articles
 
-        for processing in gn_config_processing.processings:
-            try:
-                processing = processing()
-                articles = processing.apply_on(articles)
-
-                logger.info(
-                    f'{processing.name} processing re-applied on articles.')
-            except:
-                logger.exception(f'{processing.name} processing failed.')
+    @staticmethod
+    def _read_checkpoint(checkpoint_file: str) -> typing.Optional[bson.ObjectId]:
+        """Return the _id of the last article handled by an unfinished re-extraction (None if there is none)."""
 
-        self.update_articles(articles)
-        logger.info(
-            f'{len(articles)} articles re-extracted and re-processed.')
+        try:
+            with open(checkpoint_file, 'r') as checkpoint:
+                return bson.ObjectId(json.load(checkpoint)['last_id'])
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _write_checkpoint(checkpoint_file: str, last_id: bson.ObjectId) -> None:
+        """Save the _id of the last article handled by the re-extraction."""
+
+        os.makedirs(os.path.dirname(checkpoint_file) or '.', exist_ok=True)
+        tmp_file = f'{checkpoint_file}.tmp'
+        with open(tmp_file, 'w') as checkpoint:
+            json.dump({'last_id': str(last_id),
+                       'updated_at': dt.datetime.now().isoformat()}, checkpoint)
+        os.replace(tmp_file, checkpoint_file)
@@ -0,0 +1,57 @@
+"""
+Registry of the NLP models (stanza pipelines and spaCy models) used by the processings.
+The models are loaded on first use only and shared by every module that asks for them.
+"""
+
+import time
+import typing
+import logging
+import threading
+
+if typing.TYPE_CHECKING:
+    # Only for the annotations: stanza and spacy are imported when a model is loaded
+    import spacy
+    import stanza
+
+logger = logging.getLogger('genderednews.model_registry')
+logger_debug = logging.getLogger('genderednews_debug.model_registry')
+
+_models: typing.Dict[typing.Tuple[str, str], typing.Any] = {}
+_lock = threading.Lock()
+
+
+def _get_model(kind: str, name: str, load: typing.Callable[[], typing.Any]) -> typing.Any:
+    """Return the model (kind, name), loading it with load() the first time it is asked for."""
+
+    key = (kind, name)
+    if key not in _models:
+        with _lock:
+            # Another thread may have loaded it while this one was waiting for the lock
+            if key not in _models:
+                start = time.monotonic()
+                _models[key] = load()
+                duration = time.monotonic() - start
+                logger.info(f'{kind} model \'{name}\' loaded in {duration:.1f}s.')
+                logger_debug.info(
+                    f'{kind} model \'{name}\' loaded in {duration:.1f}s.')
+    return _models[key]
+
+
+def get_stanza_pipeline(lang: str = 'fr') -> 'stanza.Pipeline':
+    """Return the stanza pipeline of a language (the same instance for every caller)."""
+
+    def load():
+        import stanza
+        return stanza.Pipeline(lang, use_gpu=False)
+
+    return _get_model('stanza', lang, load)
+
+
+def get_spacy_model(name: str = 'fr_core_news_md') -> 'spacy.language.Language':
+    """Return a spaCy model (the same instance for every caller)."""
+
+    def load():
+        import spacy
+        return spacy.load(name)
+
+    return _get_model('spacy', name, load)
@@ -8,13 +8,27 @@ import inspect
 import pathlib
 import logging
 import typing
-import time
+import concurrent.futures as cf
 
 import gn_modules.article as gn_article
 
 logger = logging.getLogger('genderednews.processing')
 logger_debug = logging.getLogger('genderednews_debug.processing')
 
+# Instance of the processing used by a worker process of Processing.process_in_parallel
+_worker_processing: 'Processing' = None
+
+
+def _init_worker(processing_class: typing.Type['Processing'], init_kwargs: typing.Dict) -> None:
+    """Instanciate the processing once per worker process (this is where the heavy resources are loaded)."""
+    global _worker_processing
+    _worker_processing = processing_class(**init_kwargs)
+
+
+def _process_in_worker(articles: typing.List[gn_article.Article]) -> typing.List:
+    """Process a chunk of articles with the processing of the worker process."""
+    return _worker_processing.process(articles)
+
 
 class Processing(abc.ABC):
     """
@@ -22,8 +36,12 @@ class Processing(abc.ABC):
     Any processing step for the article must be a subclass of Processing and override the process function.
     The process method will be automatically called in the main program through the apply_on method.
     The apply_on method adds some extra metadata on top of the processing(s) computed by the process.
+    With n_jobs > 1, apply_on runs process in a pool of n_jobs processes (see process_in_parallel).
     """
 
+    N_JOBS = 1
+    CHUNKSIZE = 20
+
     def __init__(self) -> None:
         self.name = ''
         self.indicators = []
@@ -38,13 +56,21 @@ class Processing(abc.ABC):
         processings = []
         article: gn_article.Article
         for article in articles:
-            time.sleep(1)
             processing = self.process_text_one_article(article.get_text())
             logger_debug.debug(f'Article {article.link} processed...')
             logger_debug.debug(f'... processing: {processing}')
             processings.append(processing)
         return processings
 
+    def get_init_kwargs(self) -> typing.Dict:
+        """
+        Return the arguments of the constructor of this processing (as keyword arguments).
+        The worker processes of process_in_parallel instanciate their processing with them:
+        a processing whose constructor takes arguments must override this method.
+        """
+
+        return {}
+
     def process_text_one_article(self, txt: str) -> typing.Dict:
         """
         Take the text of one article as an argument and return a dictionnary of the computed indicators.
@@ -55,13 +81,45 @@ class Processing(abc.ABC):
 
         return None
 
-    def apply_on(self, articles: typing.List[gn_article.Article]) -> typing.List[gn_article.Article]:
+    def process_in_parallel(self, articles: typing.List[gn_article.Article], n_jobs: int, chunksize: int = None) -> typing.List:
+        """
+        Same as process but the articles are split in chunks of chunksize articles
+        which are processed by a pool of n_jobs processes. The results are returned in the order of the articles.
+        Each worker process instanciates its own processing (and loads its resources) once, when it starts,
+        with the same constructor arguments as this processing (see get_init_kwargs).
+        """
+
+        chunksize = chunksize if chunksize else self.CHUNKSIZE
+
+        # The texts are downloaded here: the download rate limiter is not shared between processes
+        article: gn_article.Article
+        for article in articles:
+            article.get_text()
+
+        chunks = [articles[i:i + chunksize]
+                  for i in range(0, len(articles), chunksize)]
+        logger_debug.debug(
+            f'{len(articles)} articles split in {len(chunks)} chunks for {n_jobs} processes.')
+        with cf.ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                                    initargs=(type(self), self.get_init_kwargs())) as executor:
+            processings = []
+            for chunk_processings in executor.map(_process_in_worker, chunks):
+                processings.extend(chunk_processings)
+        return processings
+
+    def apply_on(self, articles: typing.List[gn_article.Article], n_jobs: int = None) -> typing.List[gn_article.Article]:
         """
         Call process on articles to compute the indicator(s) and then
         add the indicator(s) to the articles along with the moment they were computed at (now).
+        If n_jobs (N_JOBS by default) is greater than 1, the articles are processed in n_jobs processes.
         """
 
-        processing_result_for_articles = self.process(articles)
+        n_jobs = n_jobs if n_jobs else self.N_JOBS
+        if n_jobs > 1 and len(articles) > 1:
+            processing_result_for_articles = self.process_in_parallel(
+                articles, n_jobs)
+        else:
+            processing_result_for_articles = self.process(articles)
         now = dt.datetime.now()
 
         article: gn_article.Article
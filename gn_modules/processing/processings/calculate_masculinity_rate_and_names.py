@@ -7,9 +7,8 @@ import sys
 import pandas as pd
 import newspaper as np
 # from nltk import RegexpTokenizer
-import spacy
-import gn_modules.processing.processings.masculinity_rate_and_names as masculinity
-nlp = spacy.load("fr_core_news_md")
+import gn_modules.processing.model_registry as gn_models
+import gn_modules.processing.text_normalization as gn_text_normalization
 
 def process_text_one_article(txt: str):
     """
@@ -17,13 +16,13 @@ def process_text_one_article(txt: str):
     of each name masculinity.
     """
     names_df = __get_names_df()
-    txt = masculinity.MasculinityRateAndNames().normalize_txt(txt)
+    txt = gn_text_normalization.normalize_txt(txt)
     """
     # OLD: method without NER extraction (the found first names are matched with any tokens in the text)
     pattern = r"\b[dlnmtsj]'|qu'|\w+(?:['-]\w+)*"
     tokenizer = RegexpTokenizer(pattern)
     list_tokens = tokenizer.tokenize(txt)
-    list_tokens = masculinity.MasculinityRateAndNames().filter_uppercase(list_tokens)
+    list_tokens = [token for token in list_tokens if token[0].isupper()]
     txt_tokens = pd.DataFrame({'word': [word.lower() for word in list_tokens]})
     txt_tokens_with_name = pd.merge(txt_tokens, names_df, how='left')
     _names = txt_tokens_with_name.dropna(
@@ -31,7 +30,7 @@ def process_text_one_article(txt: str):
     _names = _names['word']
     m_rate = txt_tokens_with_name['sexratio_prenom'].mean()"""
     # Method with NER extraction
-    doc = nlp(txt)
+    doc = gn_models.get_spacy_model("fr_core_news_md")(txt)
     ents = [ent.text for ent in doc.ents if ent[0].ent_type_ == "PER"]
     if ents:
         # TODO: this assumes that the first tok of the ent is always the first name
@@ -0,0 +1,56 @@
+"""
+Load the INSEE first names tables of the data folder (data/prenoms.csv and data/prenoms_clean.csv).
+"""
+
+import os
+import re
+import typing
+import functools
+import pandas as pd
+
+DATA_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+PRENOMS = 'prenoms.csv'
+PRENOMS_CLEAN = 'prenoms_clean.csv'
+
+
+@functools.lru_cache(maxsize=None)
+def get_names_ratios(filename: str = PRENOMS_CLEAN) -> typing.Dict[str, float]:
+    """
+    Return a dict first name (lowercase) -> masculinity ratio of the name (1 is completely male, 0 completely female)
+    from a names file of the data folder. The file is read once, every caller shares the same dict (do not modify it).
+    The ratios are converted to float here: data/prenoms.csv uses decimal commas, data/prenoms_clean.csv decimal points.
+    """
+
+    names_df = pd.read_csv(os.path.join(DATA_DIRECTORY, filename), sep=';',
+                           usecols=['preusuel', 'sexratio_prenom'], dtype={'sexratio_prenom': str})
+    ratios = names_df['sexratio_prenom'].str.replace(',', '.', regex=False).astype(float)
+
+    names_ratios = {}
+    for name, ratio in zip(names_df['preusuel'].str.lower(), ratios):
+        # The first row of a name wins, like a lookup in the file would
+        names_ratios.setdefault(name, ratio)
+    return names_ratios
+
+
+class NameMatcher():
+    """
+    The NameMatcher finds the first names of a names dict (see get_names_ratios) in a text, in a single scan.
+    The text is cut in tokens (words, compound words such as "Jean-Christophe" or "aujourd'hui",
+    and elided articles or pronouns such as "l'" or "qu'"), a token is a name if it is capitalized
+    and if it is in the names dict as a whole: "Jean-Christophe" matches the name "jean-christophe", never "jean".
+    """
+
+    TOKEN_PATTERN = re.compile(r"\b[dlnmtsj]'|qu'|\w+(?:['-]\w+)*")
+
+    def __init__(self, names_ratios: typing.Dict[str, float]) -> None:
+        self.names_ratios = names_ratios
+
+    def find_names(self, txt: str) -> typing.List[typing.Tuple[str, int, int]]:
+        """Return the names found in txt as (name as written in txt, start, end) in the order of the text."""
+
+        names = []
+        for match in self.TOKEN_PATTERN.finditer(txt):
+            token = match.group()
+            if token[0].isupper() and token.lower() in self.names_ratios:
+                names.append((token, match.start(), match.end()))
+        return names
@@ -2,19 +2,23 @@
 Define the MasculinityRateAndNames class.
 """
 
-import os
 import typing
-import unicodedata
-import re
+import logging
+import numpy as np
 import pandas as pd
-from nltk import RegexpTokenizer
 #import stanza
 
 
+import gn_modules.article as gn_article
 import gn_modules.processing.processing as gn_processing
+import gn_modules.processing.text_normalization as gn_text_normalization
+import gn_modules.processing.processings.first_names as first_names
 #from gn_modules.processing.processings.quote_extractor.french_pipeline.genderization import remove_titles, extract_first_name, clean_ne
 #nlp = stanza.Pipeline("fr",use_gpu=False)
 
+logger = logging.getLogger('genderednews.masculinity_rate_and_names')
+logger_debug = logging.getLogger('genderednews_debug.masculinity_rate_and_names')
+
 
 class MasculinityRateAndNames(gn_processing.Processing):
     """
@@ -24,27 +28,60 @@ class MasculinityRateAndNames(gn_processing.Processing):
     """
 
     MASCULINITY_RATE = 'masculinity_rate'
+    NAMES = 'names'
 
     def __init__(self) -> None:
         self.name = 'masculinity_rate_and_names'
-        self.indicators = [self.MASCULINITY_RATE]
+        self.indicators = [self.MASCULINITY_RATE, self.NAMES]
+        # first name -> masculinity ratio, from data/prenoms_clean.csv (the genderization of the quotes
+        # loads data/prenoms.csv with the same loader, see first_names.get_names_ratios)
+        self.names_ratios = first_names.get_names_ratios(first_names.PRENOMS_CLEAN)
+        self.name_matcher = first_names.NameMatcher(self.names_ratios)
         self.names_df = self.__get_names_df()
 
+    def process(self, articles: typing.List[gn_article.Article]) -> typing.List:
+        """
+        Same as the default process (see process_text_one_article) but vectorised over the whole batch:
+        the names found in every article are put in a single dataframe along with the index of their article,
+        matched with names_df in one join and the masculinity rate of each article is the mean of its group.
+        """
+
+        article_ids = []
+        words = []
+        names_list = []
+        article: gn_article.Article
+        for i, article in enumerate(articles):
+            names = [name for name, _, _ in self.name_matcher.find_names(
+                self.normalize_txt(article.get_text()))]
+            names_list.append(names)
+            article_ids.extend([i] * len(names))
+            words.extend(name.lower() for name in names)
+
+        tokens = pd.DataFrame({'article': article_ids, 'word': words})
+        tokens_with_name = pd.merge(tokens, self.names_df, how='left')
+        # Articles without any name get a NaN rate, like in process_text_one_article
+        m_rates = tokens_with_name.groupby('article')['sexratio_prenom'].mean().reindex(
+            range(len(articles)))
+
+        processings = []
+        for article, m_rate, names in zip(articles, m_rates, names_list):
+            processing = {self.MASCULINITY_RATE: m_rate, self.NAMES: names}
+            logger_debug.debug(f'Article {article.link} processed...')
+            logger_debug.debug(f'... processing: {processing}')
+            processings.append(processing)
+        return processings
+
     def process_text_one_article(self, txt: str) -> typing.Dict:
         """
-        Match names from the names_df to the article text and comput the masculinity_rate as the mean
+        Match names from names_ratios to the article text and comput the masculinity_rate as the mean
         of each name masculinity.
         """
         # Method without NER extraction (the found first names are matched with any token in the text)
         txt = self.normalize_txt(txt)
-        pattern = r"\b[dlnmtsj]'|qu'|\w+(?:['-]\w+)*"
-        tokenizer = RegexpTokenizer(pattern)
-        list_tokens = tokenizer.tokenize(txt)
-        list_uppercase = self.filter_uppercase(list_tokens)
-        txt_tokens = pd.DataFrame(
-            {'word': [word.lower() for word in list_uppercase]})
-        txt_tokens_with_name = pd.merge(txt_tokens, self.names_df, how='left')
-        m_rate = txt_tokens_with_name['sexratio_prenom'].mean()
+        names = [name for name, _, _ in self.name_matcher.find_names(txt)]
+        ratios = np.fromiter((self.names_ratios[name.lower()] for name in names),
+                             dtype=float, count=len(names))
+        m_rate = pd.Series(ratios).mean()
 
         # Method with NER extraction (the found first names are only matched with extracted named entities)
         """
@@ -62,66 +99,19 @@ class MasculinityRateAndNames(gn_processing.Processing):
         gendered_names = pd.merge(txt_fnames, self.names_df, how='left')
         m_rate = gendered_names['sexratio_prenom'].mean()
         """
-        return {self.MASCULINITY_RATE: m_rate}
+        return {self.MASCULINITY_RATE: m_rate, self.NAMES: names}
 
     def __get_names_df(self) -> pd.DataFrame:
         """
-        Return a pandas dataframe from the data/prenoms_clean.csv file.
+        Return a pandas dataframe (word, sexratio_prenom) from the data/prenoms_clean.csv file.
         """
 
-        name_file = os.path.join(os.path.dirname(
-            os.path.abspath(__file__)), 'data/prenoms_clean.csv')
-
-        names_df = pd.read_csv(name_file, sep=';')
-        names_df = names_df.rename(columns={'preusuel': 'word'})
-
-        return names_df
+        return pd.DataFrame({'word': list(self.names_ratios.keys()),
+                             'sexratio_prenom': list(self.names_ratios.values())})
 
     def normalize_txt(self, txt, rm_new_lines=False, lower=False):
         """
-        Normalize text
+        Normalize text (see text_normalization.normalize_txt)
         """
 
-        # Convert txt to unicode
-        if isinstance(txt, bytes):
-            txt = txt.decode(encoding='utf-8', errors='strict')
-        elif isinstance(txt, str):
-            pass
-        else:
-            raise TypeError("not expecting type '%s'" % type(txt))
-
-        # Normalize unicode
-        txt = unicodedata.normalize("NFC", txt)
-
-        # Normalize whitespace characters and remove carriage return
-        if rm_new_lines:
-            remap = {ord('\f'): ' ', ord('\r'): '',
-                     ord('\n'): '', ord('\t'): ''}
-            txt = txt.translate(remap)
-        else:
-            remap = {ord('\f'): ' ', ord('\r'): ''}
-            txt = txt.translate(remap)
-
-        # Remove URLs in text
-        pattern = re.compile(r'(?:www|http)\S+|<\S+|\w+\/*>')
-        txt = re.sub(pattern, '', txt)
-
-        # Remove multiple spaces
-        pattern = re.compile(r'( ){2,}')
-        txt = re.sub(pattern, r' ', txt)
-
-        # to lowercase
-        if lower:
-            txt = txt.lower()
-
-        return txt
-
-    def filter_uppercase(self, list_tokens: list):
-        """
-        Filter tokens that start with an uppercase letter
-        """
-        res = []
-        for tokens in list_tokens:
-            if tokens[0].isupper():
-                res.append(tokens)
-        return res
+        return gn_text_normalization.normalize_txt(txt, rm_new_lines, lower)
@@ -19,9 +19,83 @@ import re
 from statistics import mean
 import pandas as pd
 import os
+import logging
+import threading
+import collections
 
 import stanza
-nlp = stanza.Pipeline("fr",use_gpu=False)
+import gn_modules.processing.model_registry as gn_models
+import gn_modules.processing.processings.first_names as first_names
+
+logger_debug = logging.getLogger('genderednews_debug.genderization')
+
+def nlp(doc):
+    """Parse doc with the stanza pipeline shared with the quote extractor (loaded on first use)."""
+    return gn_models.get_stanza_pipeline("fr")(doc)
+
+
+class SpeakerParseCache():
+    """
+    Bounded LRU cache of the stanza parses of the speaker strings, shared by check_NER and check_job
+    so that a speaker string is parsed once, and recurring speakers ("le président") once for all the articles.
+    The hits and misses are counted once per speaker lookup by parse_all (the speakers of an article),
+    parse only counts the parses of the texts that parse_all has not prepared.
+    """
+
+    MAXSIZE = 10000
+
+    def __init__(self, maxsize=MAXSIZE):
+        self.maxsize = maxsize
+        self._parses = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, text):
+        """Return the cached parse of text (None if it is not cached)."""
+        with self._lock:
+            if text in self._parses:
+                self._parses.move_to_end(text)
+                return self._parses[text]
+            return None
+
+    def _put(self, text, doc):
+        with self._lock:
+            self._parses[text] = doc
+            self._parses.move_to_end(text)
+            while len(self._parses) > self.maxsize:
+                self._parses.popitem(last=False)
+
+    def parse(self, text):
+        """Return the stanza parse of text (parsed only if it is not cached)."""
+        doc = self._get(text)
+        if doc is None:
+            with self._lock:
+                self.misses += 1
+            doc = nlp(text)
+            self._put(text, doc)
+        return doc
+
+    def parse_all(self, texts):
+        """Parse in a single stanza call (multi-document API) the texts that are not cached yet,
+        counting a hit for each text already cached (or repeated) and a miss for each text parsed."""
+        with self._lock:
+            texts = [text for text in texts if text.strip()]
+            missing = list(dict.fromkeys(text for text in texts if text not in self._parses))
+            self.misses += len(missing)
+            self.hits += len(texts) - len(missing)
+        if missing:
+            docs = nlp([stanza.Document([], text=text) for text in missing])
+            for text, doc in zip(missing, docs):
+                self._put(text, doc)
+
+    def hit_rate(self):
+        """Share of the parses answered by the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+speaker_parses = SpeakerParseCache()
 
 occupations_file = os.path.join(os.path.dirname(os.path.abspath(__file__)),'../../data/occupations_clean.csv')
 jobs_df = pd.read_csv(occupations_file, delimiter=";",index_col=0, header=None, squeeze=True)
@@ -31,36 +105,63 @@ jobs_dict=jobs_df.to_dict()
 import gender_guesser.detector as gender
 d = gender.Detector()
 
-prenoms_file = os.path.join(os.path.dirname(os.path.abspath(__file__)),'../../data/prenoms.csv')
-names_df = pd.read_csv(prenoms_file, delimiter=";")
+# first name -> masculinity ratio, from data/prenoms.csv
+names_ratios = first_names.get_names_ratios(first_names.PRENOMS)
+
+# --- title and pronoun rules (compiled once)
+HONORIFICS_M = ["Mr", "M(\.)?","Monsieur","Sir", "Père", "Frère"]
+HONORIFICS_F = ["Ms", "Mrs", "Miss", "Madame","Mme", "Mlle", "Mademoiselle","Mère","Sœur"]
+# Words that are never part of a name (removed by remove_titles), besides the honorifics above
+OTHER_TITLES = ["Dr", "Dame", "Hon", "Professor", "Prof", "Rev", "Me",
+                "QC", "CBE", "MBE", "BM", "MD", "DM", "BHB", "CBC",
+                "Reverend", "Recorder", "Headteacher", "Councillor", "Cllr", "Father", "Fr",
+                "Mother", "Grandmother", "Grandfather", "Creator", "S(œ|oe)ur", "Grand-père", "Grand-mère",
+                "et al", "www", "href", "http", "https", "Ref", "rel", "eu", "span", "Rd", "St"]
+
+# Ensure only whole words are matched (\b is word boundary)
+HONORIFICS_M_PATTERN = re.compile(r"\b({})\b".format(r"|".join(HONORIFICS_M)))
+HONORIFICS_F_PATTERN = re.compile(r"\b({})\b".format(r"|".join(HONORIFICS_F)))
+# A single scan finds every title and tells if it is a male (group m) or a female (group f) honorific
+TITLES_PATTERN = re.compile(r"\b(?:(?P<m>{})|(?P<f>{})|{})\b".format(
+    r"|".join(HONORIFICS_M), r"|".join(HONORIFICS_F), r"|".join(OTHER_TITLES)))
+
+# NOTE: "\b" is not a raw string here (backspace), the pronoun is only matched at the start of the speaker
+PRONOUN_M_PATTERN = re.compile("(\b|^)(-?([Ii]l(s)?)|lui)\.?(\b|$)")
+PRONOUN_F_PATTERN = re.compile("(\b|^)(-?[Ee]lle(s)?)\.?(\b|$)")
+
+SPECIAL_CHARS_PATTERN = re.compile('[&\"\/\(\)=+\}\{*\.#^$£!:;?,§~\[\]`<>]')
+SPACES_PATTERN = re.compile(r'\s+')
 
 # --- utils
+def match_speaker(speaker):
+    """Single pass over the titles of the speaker
+    returns (title gender, pronoun gender) see check_title and check_pronoun"""
+    title_genders = set()
+    for match in TITLES_PATTERN.finditer(speaker):
+        if match.group("m") is not None:
+            title_genders.add(1)
+        elif match.group("f") is not None:
+            title_genders.add(0)
+    title_gender = 1 if 1 in title_genders else (0 if 0 in title_genders else None)
+    return title_gender, check_pronoun(speaker)
+
 def remove_titles(txt):
     """Method to clean special titles that appear as prefixes or suffixes to
        people's names (common especially in articles from British/European sources).
        The words that are marked as titles are chosen such that they can never appear
        in any form as a person's name (e.g., "Mr", "MBE" or "Headteacher").
     """
-    honorifics = ["Mr", "Ms", "Mrs", "Miss", "Dr", "Sir", "Dame", "Hon", "Professor",
-                  "Prof", "Rev", "Me", "M(\.)?","Monsieur", "Madame","Mme", "Mlle", "Mademoiselle"]
-    titles = ["QC", "CBE", "MBE", "BM", "MD", "DM", "BHB", "CBC",
-              "Reverend", "Recorder", "Headteacher", "Councillor", "Cllr", "Father", "Fr",
-              "Mother", "Grandmother", "Grandfather", "Creator", "Père", "Frère", "S(œ|oe)ur","Mère","Grand-père", "Grand-mère"]
-    extras = ["et al", "www", "href", "http", "https", "Ref", "rel", "eu", "span", "Rd", "St"]
-    banned_words = r'|'.join(honorifics + titles + extras)
-    # Ensure only whole words are replaced (\b is word boundary)
-    pattern = re.compile(r'\b({})\b'.format(banned_words)) 
-    txt = pattern.sub('', txt)
+    txt = TITLES_PATTERN.sub('', txt)
     return txt.strip()
 
 def clean_ne(name):
     """Clean named entities for standardization in encoding and name references."""
-    name = re.sub('[&\"\/\(\)=+\}\{*\.#^$£!:;?,§~\[\]`<>]', ' ', name).strip()   # Remove all special characters from name except dash (to keep names such as "Jean-Christophe")
+    name = SPECIAL_CHARS_PATTERN.sub(' ', name).strip()   # Remove all special characters from name except dash (to keep names such as "Jean-Christophe")
     # Remove 's from end of names. Frequent patterns found in logs.
     # the ' has been replace with space in last re.sub function
     if name.endswith(' s'):
         name = name[:-2]
-    name = re.sub(r'\s+', ' ', name)
+    name = SPACES_PATTERN.sub(' ', name)
     name = remove_titles(name)
     return name.strip()
 
@@ -74,38 +175,41 @@ def extract_first_name(full_name):
 # --- check functions
 def check_title(speaker):
     title_gender = None
-    honorifics_M = r"|".join(["Mr", "M(\.)?","Monsieur","Sir", "Père", "Frère"])
-    honorifics_F = r"|".join(["Ms", "Mrs", "Miss", "Madame","Mme", "Mlle", "Mademoiselle","Mère","Sœur"])
-    if re.search(re.compile(r"\b({})\b".format(honorifics_M)), speaker) is not None:
+    if HONORIFICS_M_PATTERN.search(speaker) is not None:
         title_gender = 1
-    elif re.search(re.compile(r"\b({})\b".format(honorifics_F)), speaker) is not None:
+    elif HONORIFICS_F_PATTERN.search(speaker) is not None:
         title_gender = 0
     return title_gender
 
 
 def check_pronoun(speaker):
     pron_gender = None
-    if re.search("(\b|^)(-?([Ii]l(s)?)|lui)\.?(\b|$)",speaker) is not None:
+    if PRONOUN_M_PATTERN.search(speaker) is not None:
         pron_gender = 1
-    elif re.search("(\b|^)(-?[Ee]lle(s)?)\.?(\b|$)",speaker) is not None:
+    elif PRONOUN_F_PATTERN.search(speaker) is not None:
         pron_gender = 0
     return pron_gender
 
-def check_NER(speaker):
+def check_NER(speaker, speaker_span=None):
+    """speaker_span: the SpeakerSpan of the speaker in the article parse, if None the speaker string is parsed"""
     ner_gender = None
-    speaker = clean_ne(speaker)
-    doc = nlp(speaker)
-    ents = [ent for ent in doc.entities if ent.type == "PER"]
+    if speaker_span is None:
+        speaker = clean_ne(speaker)
+        doc = speaker_parses.parse(speaker)
+        ents = [ent for ent in doc.entities if ent.type == "PER"]
+    else:
+        ents = [ent for ent in speaker_span.entities if ent.type == "PER"]
     if len(ents) > 0:
         candidate_speaker = ents[0].text #assuming it's the first entity in the speaker if there is several
+        if speaker_span is not None:
+            candidate_speaker = clean_ne(candidate_speaker)
         speaker = remove_titles(candidate_speaker)
         first_name = extract_first_name(speaker)
         if first_name is not None:
             #Insee database method
             try:
-                gender_score_name = names_df.loc[(names_df["preusuel"]==first_name.lower()),"sexratio_prenom"].values[0]
-                return float(gender_score_name.replace(",","."))
-            except (KeyError,IndexError):
+                return names_ratios[first_name.lower()]
+            except KeyError:
                 # Else: gender_guesser method
                 gender = d.get_gender(first_name)
                 if gender == "female":
@@ -121,27 +225,54 @@ def check_NER(speaker):
                 return ner_gender
     return ner_gender
 
-def check_job(speaker):
+def check_job(speaker, speaker_span=None):
+    """speaker_span: the SpeakerSpan of the speaker in the article parse, if None the speaker string is parsed"""
     #TODO: add "ambiguous" job names (e.g: "ministre") and check gender with parser feats
     job_gender = None
-    doc = nlp(speaker)
-    nouns = [noun.text.lower() for noun in doc.sentences[0].words if noun.upos == "NOUN"]
+    if speaker_span is None:
+        doc = speaker_parses.parse(speaker)
+        words = doc.sentences[0].words
+    else:
+        words = speaker_span.words
+    nouns = [noun.text.lower() for noun in words if noun.upos == "NOUN"]
     for noun in nouns:
         if noun in jobs_dict.keys():
             job_gender = jobs_dict[noun]
     return job_gender
 
+# --- speaker spans
+# The words and the entities of the article parse that belong to a speaker
+SpeakerSpan = collections.namedtuple("SpeakerSpan", ["words", "entities"])
+
+def get_speaker_span(doc, speaker_index):
+    """Return the SpeakerSpan of the words and entities of doc (the article parse) within speaker_index
+    speaker_index is the (start, end) char offsets of the speaker, as given by the quote extractor
+    (the entities that are only partly in the span, such as a neighbouring name, are not the speaker's)"""
+    start, end = speaker_index
+    words = []
+    for sent in doc.sentences:
+        # Skip the sentences that do not overlap the speaker
+        if sent.tokens[-1].end_char <= start or sent.tokens[0].start_char >= end:
+            continue
+        for token in sent.tokens:
+            if token.start_char >= start and token.end_char <= end:
+                words.extend(token.words)
+    entities = [ent for ent in doc.entities if ent.start_char >= start and ent.end_char <= end]
+    return SpeakerSpan(words, entities)
+
 # main functions
-def get_gender(speaker):
-    """tries to determine the gender of the speaker from several criteria"""
+def get_gender(speaker, speaker_span=None):
+    """tries to determine the gender of the speaker from several criteria
+    speaker_span: the SpeakerSpan of the speaker in the article parse (see get_speaker_span), if None the speaker string is parsed"""
     if speaker == "":
         return "unknown"
     else:
+        title_gender, pron_gender = match_speaker(speaker)
         indices_list = {
-            "title":check_title(speaker),
-            "pron":check_pronoun(speaker),
-            "ner":check_NER(speaker),
-            "jobs":check_job(speaker)
+            "title":title_gender,
+            "pron":pron_gender,
+            "ner":check_NER(speaker, speaker_span),
+            "jobs":check_job(speaker, speaker_span)
             }
         try:
             m = mean([ind for ind in indices_list.values() if ind is not None])
@@ -155,10 +286,23 @@ def get_gender(speaker):
         except:
             return "unknown"
 
-def genderize_quotes(quotes):
+def genderize_quotes(quotes, doc=None):
+    """doc: the stanza parse of the article the quotes were extracted from.
+    If it is given, the NER and job checks use the words and entities of the article parse at the speaker_index of each quote
+    (the (start, end) tuples of the quote extractor, before they are formatted to be stored),
+    otherwise the speaker strings are parsed again (with the speaker_parses cache)"""
+    if doc is None:
+        # Parse all the speakers of the article at once (as cleaned for check_NER and as is for check_job)
+        speakers = [q["speaker"] for q in quotes if q["speaker"] != ""]
+        speaker_parses.parse_all([clean_ne(speaker) for speaker in speakers] + speakers)
     new_quotes = []
     for q in quotes:
-        g = get_gender(q["speaker"])
+        speaker_span = None
+        if doc is not None and q["speaker"] != "":
+            speaker_span = get_speaker_span(doc, q["speaker_index"])
+        g = get_gender(q["speaker"], speaker_span)
         q["speaker_gender"] = g
         new_quotes.append(q)
+    if doc is None:
+        logger_debug.debug(f'Speaker parse cache: {speaker_parses.hits} hits, {speaker_parses.misses} misses ({speaker_parses.hit_rate():.0%}).')
     return new_quotes
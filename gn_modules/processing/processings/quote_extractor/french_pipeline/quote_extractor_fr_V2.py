@@ -1,7 +1,10 @@
 # French quote extractor script, as changed by Ange Richard from LIG Lab (Université Grenoble-Alpes)
 # See comments within the code and Readme for changes from Discourse Lab (SFU) version
 
+import time
+import bisect
 import getopt
+import contextlib
 
 import json
 import logging
@@ -16,11 +19,10 @@ import re
 import stanza
 from stanza.models.common.doc import Token
 
+import gn_modules.processing.model_registry as gn_models
+import gn_modules.processing.text_normalization as gn_text_normalization
 import gn_modules.processing.processings.quote_extractor.french_pipeline.genderization as gen
 
-START_GUILLEMETS = set()
-END_GUILLEMETS = set()
-
 if not os.path.exists('logs'):
     os.makedirs('logs')
 
@@ -63,7 +65,9 @@ quoteVerbWhiteList = ['reconnaitre', 'ajouter', 'admettre', 'annoncer', 'préten
 #Added verbs. Ambiguous verbs: ["poursuivre","juger","avouer","reconnaître", "montrer"].
 #Removed "croire" because it matched mostly wrong quotes
 
-nlp = stanza.Pipeline('fr',use_gpu=False)
+def nlp(doc):
+    """parse doc with the stanza pipeline shared with genderization (loaded on first use)"""
+    return gn_models.get_stanza_pipeline('fr')(doc)
 
 # ----- Formatting Functions
 def get_str(subtree, doc):
@@ -89,33 +93,84 @@ def get_pretty_index(key):
             return (start_char, end_char)
 
 
-def get_children(sent=None, head=None, children_list=[]):
+PUNCTUATION = [".",",",":","?","!",";",")"]
+
+class ChildrenIndex():
+    """ Child adjacency of the tokens of a sentence, built once per sentence (see DocumentContext.set_doc),
+    and cache of the subtrees of get_children. The tokens are designated by their position in sent.tokens
+    """
+
+    def __init__(self, sent):
+        self.positions = {}  # token id -> position
+        self.ids = []
+        self.is_multiword = []
+        self.is_punctuation = []
+        self.children = {}  # word id -> positions of the tokens attached to this word
+        self.subtrees = {}  # position of the head -> positions of the tokens of its subtree
+        for j, tok in enumerate(sent.tokens):
+            self.positions[tok.id] = j
+            self.ids.append(tok.id)
+            self.is_multiword.append(len(tok.words) > 1)
+            self.is_punctuation.append(tok.text in PUNCTUATION)
+            if len(tok.words) == 1:
+                heads = [tok.words[0].head]
+            else: #If token is composed of several words (or of none):
+                heads = set([w.head for w in tok.words if w.head not in tok.id])
+            for word_head in heads:
+                self.children.setdefault(word_head, []).append(j)
+
+    def get_children_positions(self, head_id):
+        """ Returns the positions of the tokens attached to one of the words of the head, in the order of the sentence"""
+        return sorted(set([j for word_id in head_id for j in self.children.get(word_id, [])]))
+
+    def get_subtree(self, head_id):
+        j = self.positions[head_id]
+        if j not in self.subtrees:
+            self.subtrees[j] = self.collect_subtree(j)
+        return self.subtrees[j]
+
+    def collect_subtree(self, root):
+        """ Same traversal as the former recursive get_children, on the adjacency:
+        the head, then the subtree of each child (a multiword token only if it is not already in the subtree),
+        and the unwanted punctuation is removed each time the subtree of a token has been collected.
+        Removing it left a punctuation token only if it was the last token and the only punctuation,
+        so only the tokens added since the previous removal need to be checked
+        """
+        children_list = []
+        members = set()
+        checked = 0  # children_list[:checked] has no punctuation
+
+        def remove_punctuation():
+            nonlocal checked
+            unchecked = children_list[checked:]
+            punctuation = [j for j in unchecked if self.is_punctuation[j]]
+            if len(punctuation) == 1 and punctuation[0] == unchecked[-1]:
+                checked = len(children_list) - 1
+            else:
+                children_list[checked:] = [j for j in unchecked if not self.is_punctuation[j]]
+                members.difference_update(punctuation)
+                checked = len(children_list)
+
+        def visit(head):
+            if head not in members:
+                children_list.append(head)
+                members.add(head)
+            for j in self.get_children_positions(self.ids[head]):
+                if not self.is_multiword[j] or j not in members:
+                    visit(j)
+            remove_punctuation()
+
+        visit(root)
+        return tuple(sorted(children_list))
+
+def get_children(context, sent, head):
     """ Returns the sorted dependencies subtree (a list of Tokens (Stanza type))
     with root as the given arg HEAD
-    Head is a TOKEN
-    Children_list is list of TOKENS
+    Head is a TOKEN of the sentence SENT of the document of the DocumentContext
+    The subtrees are computed from the ChildrenIndex of the sentence, once per head
     """
-    if head not in children_list:
-      children_list.append(head)
-    for tok in sent.tokens:
-      if len(tok.words) == 1:
-        if tok.words[0].head in head.id:
-          get_children(sent,tok,children_list)
-      elif len(tok.words) > 1: #If token is composed of several words:
-        heads = set([w.head for w in tok.words if w.head not in tok.id])
-        ids = set(head.id)
-        if len(ids.intersection(heads)) > 0 and tok not in children_list:
-          get_children(sent,tok,children_list)
-      else:
-        pass
-    #removing unwanted punctuation at the start of the tree
-    try:
-      for i in range(0,len(children_list)-1):
-        while children_list[i].text in [".",",",":","?","!",";",")"]:
-          del children_list[i]
-      return sorted(children_list, key=lambda x: x.id)
-    except IndexError:
-        return sorted(children_list, key=lambda x: x.id)
+    children_index = context.children_indices[sent]
+    return [sent.tokens[j] for j in children_index.get_subtree(head.id)]
 
 def prune_speaker_subtree(speaker_subtree):
   """ Removes possible "-t" from speaker subtrees
@@ -127,11 +182,21 @@ def prune_speaker_subtree(speaker_subtree):
 
   
 # ----- Other
-def preprocess_text(txt):
-    txt = txt.replace(u'\xa0', u' ')
+FULL_STOP_IN_QUOTE_PATTERN = re.compile("\.( )*»\.?")
+SPACES_IN_GUILLEMETS_PATTERN = re.compile("( )+»|«( )+")
+START_GUILLEMET_PATTERN = re.compile('«')
+END_GUILLEMET_PATTERN = re.compile('»')
+DIRECT_QUOTE_PATTERN = re.compile('(?<=")[^"]+(?=")')
+SELON_PATTERN = re.compile("\s*([^\.\n]*([\s^](?:[sS]elon|[Dd]'après)\s)[^\.\n]*)\s*")
+
+def preprocess_text(txt, context=None):
+    """ Returns the text prepared for the parse. The guillemets are replaced by double quotes:
+    their positions are noted in the DocumentContext if one is given"""
+    # Replace non-breaking spaces and double quotes (”, “, 〝, 〞)
+    txt = gn_text_normalization.replace_all(txt, gn_text_normalization.SPACE_AND_QUOTES_REPLACEMENTS)
 
     #fix problem of full stop inside quotes
-    txt = re.sub("\.( )*»\.?",r"».", txt)
+    txt = FULL_STOP_IN_QUOTE_PATTERN.sub(r"».", txt)
 
     # To fix the problem of not breaking at \n
     #txt = txt.replace("\n", ".\n ")
@@ -139,24 +204,18 @@ def preprocess_text(txt):
     txt = txt.replace("..\n ", ".\n ")
     txt = txt.replace(". .\n ", ".\n ")
     txt = txt.replace("  ", " ")
-    # Replace double quotes
-    txt = txt.replace("”",'"')
-    txt = txt.replace("“",'"')
-    # ---
-    txt = txt.replace("〝",'"')
-    txt = txt.replace("〞",'"')
     # Replace single quotes
     #txt = txt.replace("‘","'")
     #txt = txt.replace("’",''')
     # fix problem of spaces around quote signs
-    txt = re.sub("( )+»","»", txt)
-    txt = re.sub("«( )+","«", txt)
+    txt = SPACES_IN_GUILLEMETS_PATTERN.sub(lambda match: match.group().strip(" "), txt)
     # Note positions of all start and end guillemets
     # NOTE: This assumes that all quotes use the « » quotation marks which is far from being always the case
-    for match in re.finditer('«', txt):
-        START_GUILLEMETS.add(match.start())
-    for match in re.finditer('»', txt):
-        END_GUILLEMETS.add(match.end())
+    if context is not None:
+        for match in START_GUILLEMET_PATTERN.finditer(txt):
+            context.start_guillemets.add(match.start())
+        for match in END_GUILLEMET_PATTERN.finditer(txt):
+            context.end_guillemets.add(match.end())
     
     # Replace guillemets
     txt = txt.replace("«",'"')
@@ -165,43 +224,178 @@ def preprocess_text(txt):
 
 # ----- Helper functions
 
-def seenBefore(regex_match, quote_objects):
-    quotations = set([eval(quote_obj['quote_index']) for quote_obj in quote_objects])
-    
-    for q in quotations:
-        if fuzzy_match((regex_match.start(),regex_match.end()), (int(q[0]), int(q[1]))):
+class QuoteIntervals():
+    """ Character intervals (start, end) of the quotes already extracted from a document, sorted by start.
+    The intervals overlapping a span are found with a binary search instead of a comparison with every quote:
+    an interval overlapping (start, end) starts before end and after start - max_length
+    """
+
+    def __init__(self, quote_objects=()):
+        self.starts = []
+        self.intervals = []
+        self.max_length = 0
+        self.add_quotes(quote_objects)
+
+    def add(self, interval):
+        start, end = interval
+        i = bisect.bisect_right(self.starts, start)
+        self.starts.insert(i, start)
+        self.intervals.insert(i, (start, end))
+        self.max_length = max(self.max_length, end - start)
+
+    def add_quotes(self, quote_objects):
+        for quote_obj in quote_objects:
+            self.add(quote_obj['quote_index'])
+
+    def overlapping(self, start, end):
+        """ Returns the intervals sharing at least a character with (start, end)"""
+        first = bisect.bisect_right(self.starts, start - self.max_length)
+        last = bisect.bisect_left(self.starts, end)
+        return [interval for interval in self.intervals[first:last] if interval[1] > start]
+
+def seenBefore(regex_match, quote_intervals):
+    span = (regex_match.start(), regex_match.end())
+    # Only the overlapping quotes can have a fuzzy match with the span
+    for interval in quote_intervals.overlapping(*span):
+        if fuzzy_match(span, interval):
             # It's a match, so disregard it
             return True
     return False
 
 def fuzzy_match(indx1, indx2):
     """ Same fuzzy_match as the evaluation script so that
-    it can handle mixed quotes matched at the regex stages"""
-    indx1_set = set(range(indx1[0], indx1[1]))
-    indx2_set = set(range(indx2[0], indx2[1]))
-    score = len(indx1_set.intersection(indx2_set)) / len(indx1_set.union(indx2_set))
+    it can handle mixed quotes matched at the regex stages
+    (Jaccard index of the characters of the two intervals, computed from their bounds)"""
+    intersection = max(0, min(indx1[1], indx2[1]) - max(indx1[0], indx2[0]))
+    union = max(0, indx1[1] - indx1[0]) + max(0, indx2[1] - indx2[0]) - intersection
+    score = intersection / union
     return score > 0.3
 
+class CharOffsets(tuple):
+    """ (start, end) index computed from character offsets by the regex stages.
+    It is stored as "(start,end)", the indices of get_pretty_index as "(start, end)" (see format_indices)
+    """
+
+    def __new__(cls, start, end):
+        return super().__new__(cls, (start, end))
+
+    def __str__(self):
+        return '({0},{1})'.format(*self)
+
+def format_indices(quote_objects):
+    """ Converts the (start, end) indices of the quotes to strings, as they are stored"""
+    for quote_obj in quote_objects:
+        for index in ['quote_index', 'verb_index', 'speaker_index']:
+            if quote_obj[index] != '':
+                quote_obj[index] = str(quote_obj[index])
+    return quote_objects
+
+class PositionIndex(dict):
+    """ Dictionary indexed by character position, which keeps its positions sorted
+    so that the closest positions before or after a character are found with a binary search.
+    It is built once from all its items and must not be modified afterwards
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.positions = sorted(self)
+
+def get_sentence_index(doc):
+    """ Returns the PositionIndex of the (sentence number, sentence) of doc, indexed by start character"""
+    sentence_dict = {}
+    for i,sent in enumerate(doc.sentences):
+      sentence_dict[get_pretty_index(sent.tokens[0])[0]] = i,sent
+    return PositionIndex(sentence_dict)
+
+def get_named_people_index(doc):
+    """ Returns the PositionIndex of the named entities of type person of doc, indexed by start character"""
+    named_people_dict = {}
+    for ent in doc.ents:
+        if ent.type == 'PER':
+            named_people_dict[ent.start_char] = ent
+    return PositionIndex(named_people_dict)
+
+def get_pronoun_index(doc):
+    """ Returns the PositionIndex of the tokens of the pronouns of doc, indexed by start character"""
+    pronoun_dict = {}
+    for sent in doc.sentences:
+      for word in sent.words:
+        if word.pos == 'PRON':
+          pronoun_dict[get_pretty_index(word.parent)[0]] = word.parent
+    return PositionIndex(pronoun_dict)
+
 def getSentenceNumber(sentence_dict, char):
-    keys_subset = [k for k in sentence_dict.keys() if k <= char]
-    assert len(keys_subset) > 0
-    sentence_char = max(keys_subset)
+    i = bisect.bisect_right(sentence_dict.positions, char)
+    assert i > 0
+    sentence_char = sentence_dict.positions[i - 1]
     return sentence_dict[sentence_char]
 
 def getClosestPreceding(preceding_dict, char):
-    keys_subset = [k for k in preceding_dict.keys() if k <= char]
-    if len(keys_subset) > 0:
-        return max(keys_subset)
+    i = bisect.bisect_right(preceding_dict.positions, char)
+    if i > 0:
+        return preceding_dict.positions[i - 1]
     else:
         return -1
 
 def getClosestFollowing(following_dict, char):
-    keys_subset = [k for k in following_dict.keys() if k >= char]
-    if len(keys_subset) > 0:
-        return min(keys_subset)
+    i = bisect.bisect_left(following_dict.positions, char)
+    if i < len(following_dict.positions):
+        return following_dict.positions[i]
     else:
         return -1
     
+# ----- Document context
+
+@contextlib.contextmanager
+def timed(timings, stage):
+    """ Adds the duration of the with block to timings[stage] (in seconds)"""
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0) + time.monotonic() - start
+
+def add_timings(timings, stage_timings):
+    """ Adds the durations of stage_timings to timings (if timings is not None)"""
+    if timings is not None:
+        for stage, duration in stage_timings.items():
+            timings[stage] = timings.get(stage, 0) + duration
+
+class DocumentContext():
+    """ State of the quote extraction of one document: its preprocessed text, the positions of its guillemets,
+    its parse (see set_doc), the indices computed once from the parse for all the stages,
+    the index of the quotes extracted by the previous stages and the duration of each stage (timings).
+    Nothing is shared between documents, so several documents can be processed at the same time
+    """
+
+    def __init__(self, txt):
+        self.timings = {}
+        self.start_guillemets = set()
+        self.end_guillemets = set()
+        with timed(self.timings, 'preprocessing'):
+            self.text = preprocess_text(txt, self)
+        self.doc = None
+        self.quote_intervals = QuoteIntervals()
+
+    def set_doc(self, doc):
+        """ Sets the parse of the text and computes the indices shared by the stages:
+        the child adjacency of each sentence (see get_children),
+        sentences, named people and pronouns by start character and the direct quotes between guillemets"""
+        with timed(self.timings, 'indices'):
+            self.doc = doc
+            self.children_indices = {sent: ChildrenIndex(sent) for sent in doc.sentences}
+            self.sentence_index = get_sentence_index(doc)
+            self.named_people_index = get_named_people_index(doc)
+            self.pronoun_index = get_pronoun_index(doc)
+            self.direct_quotes = []
+            for match in DIRECT_QUOTE_PATTERN.finditer(doc.text):
+                # ignore quotes that don't start or end with the right kind of quote char
+                if match.start()-1 not in self.start_guillemets:
+                    continue
+                if match.end()+1 not in self.end_guillemets:
+                    continue
+                self.direct_quotes.append(match)
+
 def hasAlpha(text):
     for letter in text:
         if letter.isalpha():
@@ -311,7 +505,8 @@ Direct quote: "Le président mesure bien les conséquences de ces affaires dans
 Mixed quote: Nicolas Sarkozy a procédé à un "remaniement personnel", estiment les éditorialistes
 """
 
-def extract_syntactic_quotes(doc):
+def extract_syntactic_quotes(context):
+  doc = context.doc
   list_quotes = []
   checklist_q = []
   for sentence in doc.sentences:
@@ -320,17 +515,17 @@ def extract_syntactic_quotes(doc):
       if word.upos == "VERB" and (word.lemma.lower() in quoteVerbWhiteList) and word.deprel.split(":")[0] == "parataxis":
         verb_ = word
         #get speaker
-        for child in get_children(sentence,verb_.parent,[]):
+        for child in get_children(context,sentence,verb_.parent):
           if "nsubj" in [w.deprel for w in child.words]:
             #Note: this matches subject + attributes (i.e: "Me Jean-Pascal Boucher, porte-parole et responsable des relations avec les médias au DPCP" and not just "Me Jean-Pascal Boucher", as what has been annotated)
-            speaker_subtree = get_children(sentence,child,[])
+            speaker_subtree = get_children(context,sentence,child)
             speaker = prune_speaker_subtree(speaker_subtree)
             if speaker != []:
                 #get quote content
                 for w_ in sentence.words:
                   if w_.id == verb_.head:
                     # A bit rough but works okay
-                    subtree_span = [W for W in get_children(sentence,w_.parent,[]) if (W not in get_children(sentence,verb_.parent,[]) and not W.text == ".")]
+                    subtree_span = [W for W in get_children(context,sentence,w_.parent) if (W not in get_children(context,sentence,verb_.parent) and not W.text == ".")]
                     quote_str = get_str(subtree_span,doc)
 
                     #extracting necessary info:
@@ -343,11 +538,11 @@ def extract_syntactic_quotes(doc):
 
                       quote_obj = {
                       'speaker': get_str(speaker, doc),
-                      'speaker_index': str(get_pretty_index(speaker)),
+                      'speaker_index': get_pretty_index(speaker),
                       'quote': quote_str,
-                      'quote_index': str(get_pretty_index(subtree_span)),
+                      'quote_index': get_pretty_index(subtree_span),
                       'verb': verb_.text,
-                      'verb_index': str(get_pretty_index(verb_.parent)),
+                      'verb_index': get_pretty_index(verb_.parent),
                       'quote_token_count': quote_token_count,
                       'quote_type': quote_type,
                       'is_floating_quote': False,
@@ -359,7 +554,7 @@ def extract_syntactic_quotes(doc):
 
       #Note: matching "obj" deprel increases a bit the recall but it lowers a lot the precision a lot
       if word.deprel.split(":")[0] in ['ccomp','xcomp']:
-        subtree_span = get_children(sentence,word.parent,[])
+        subtree_span = get_children(context,sentence,word.parent)
         quote_str = get_str(subtree_span, doc)        
         # ---- extracting verb
         for w in sentence.words:
@@ -369,7 +564,7 @@ def extract_syntactic_quotes(doc):
             speaker = []
             for child in sentence.words:
               if (child.head == verb. id) and (child.deprel == "nsubj"):
-                speaker_subtree = get_children(sentence,child.parent,[])
+                speaker_subtree = get_children(context,sentence,child.parent)
                 speaker = prune_speaker_subtree(speaker_subtree)
 
                 #extracting necessary info:
@@ -382,11 +577,11 @@ def extract_syntactic_quotes(doc):
                   
                   quote_obj = {
                   'speaker': get_str(speaker, doc),
-                  'speaker_index': str(get_pretty_index(speaker)),
+                  'speaker_index': get_pretty_index(speaker),
                   'quote': quote_str,
-                  'quote_index': str(get_pretty_index(subtree_span)),
+                  'quote_index': get_pretty_index(subtree_span),
                   'verb': verb.text,
-                  'verb_index': str(get_pretty_index(verb.parent)),
+                  'verb_index': get_pretty_index(verb.parent),
                   'quote_token_count': quote_token_count,
                   'quote_type': quote_type,
                   'is_floating_quote': False,
@@ -410,43 +605,29 @@ This function only handles direct quotes.
 Examples of quotes extracted by the Reversed method:
 - «Chez une certaine partie des libéraux, il y a presque une haine du Québec français, a réagi le bloquiste Mario Beaulieu. On sent que c'est viscéral.»
 """
-def extract_reversed_quotes(doc, syntactic_quotes):
+def extract_reversed_quotes(context):
+    doc = context.doc
     checklist_q = []
     quote_list = []
         
-    # Create a dictionary of sentences, sentence numbers, indexed by start character
-    sentence_dict = {}
-    for i,sent in enumerate(doc.sentences):
-      sentence_dict[get_pretty_index(sent.tokens[0])[0]] = i,sent
+    # Dictionaries of sentences, sentence numbers, indexed by start character
+    sentence_dict = context.sentence_index
 
     # Named entity preprocessing
-    # Create a named entity dictionary by sentence
-    named_people_dict = {}
-    for ent in doc.ents:
-        if ent.type == 'PER':
-            named_people_dict[ent.start_char] = ent
-    
+    # Named entity dictionary by start character
+    named_people_dict = context.named_people_index
         
     # Noun chunk search has been removed for several reasons:
     # It was mostly matching wrong noun chunks as speakers
     # and Stanza library doesn't have a module as easy to use as Spacy's for this
     
-    pronoun_dict = {}
-    for sent in doc.sentences:
-      for word in sent.words:
-        if word.pos == 'PRON':
-          pronoun_dict[get_pretty_index(word.parent)[0]] = word.parent
+    pronoun_dict = context.pronoun_index
 
-    # Find list of quotes with quotation marks
+    # List of quotes with quotation marks
     regex_quotes = []
 
-    for match in re.finditer('(?<=")[^"]+(?=")', doc.text):
-        # ignore quotes that don't start or end with the right kind of quote char
-        if match.start()-1 not in START_GUILLEMETS:
-            continue
-        if match.end()+1 not in END_GUILLEMETS:
-            continue
-        if not seenBefore(match, syntactic_quotes):
+    for match in context.direct_quotes:
+        if not seenBefore(match, context.quote_intervals):
             regex_quotes.append(match)
     
     for q in regex_quotes:
@@ -466,17 +647,17 @@ def extract_reversed_quotes(doc, syntactic_quotes):
               verb = w
               for child in sentence_text.words:
                 if (child.head == verb.id) and (child.deprel == "nsubj") and (q.group(0) not in checklist_q) and quote_token_count > 3:
-                  speaker_subtree = get_children(sentence_text,child.parent,[])
+                  speaker_subtree = get_children(context,sentence_text,child.parent)
                   speaker = prune_speaker_subtree(speaker_subtree)
                   is_valid_speaker = (re.search("(^|\b)((je|nous|moi)(\b|$)|j')", get_str(speaker, doc).lower()) is None)
                   if is_valid_speaker:
                     quote_obj = {
                         'speaker': get_str(speaker, doc),
-                        'speaker_index': str(get_pretty_index(speaker)),
+                        'speaker_index': get_pretty_index(speaker),
                         'quote': q.group(0),
-                        'quote_index': '({0},{1})'.format(q.start()-1, q.end()+1),
+                        'quote_index': CharOffsets(q.start()-1, q.end()+1),
                         'verb': verb.text,
-                        'verb_index': str(get_pretty_index(verb.parent)),
+                        'verb_index': get_pretty_index(verb.parent),
                         'quote_token_count': quote_token_count,
                         'quote_type': 'QCQVS',
                         'is_floating_quote': False,
@@ -502,9 +683,9 @@ def extract_reversed_quotes(doc, syntactic_quotes):
                 person = named_people_dict[closest_person_start_char]
                 quote_obj = {
                     'speaker': person.text,
-                    'speaker_index': '({0},{1})'.format(person.start_char, person.end_char),
+                    'speaker_index': CharOffsets(person.start_char, person.end_char),
                     'quote': q.group(0),
-                    'quote_index': '({0},{1})'.format(q.start()-1, q.end()+1),
+                    'quote_index': CharOffsets(q.start()-1, q.end()+1),
                     'verb': '',
                     'verb_index': '',
                     'quote_token_count': quote_token_count,
@@ -534,9 +715,9 @@ def extract_reversed_quotes(doc, syntactic_quotes):
                 if is_valid_speaker:
                   quote_obj = {
                       'speaker': pronoun.text,
-                      'speaker_index': str(get_pretty_index(pronoun)),
+                      'speaker_index': get_pretty_index(pronoun),
                       'quote': q.group(0),
-                      'quote_index': '({0},{1})'.format(q.start(), q.end()),
+                      'quote_index': CharOffsets(q.start(), q.end()),
                       'verb': '',
                       'verb_index': '',
                       'quote_token_count': quote_token_count,
@@ -561,24 +742,14 @@ Examples of quotes extracted by the floating method:
 TODO
 """
 
-def extract_floating_quotes(doc, quotations):
+def extract_floating_quotes(context, quotations):
+    doc = context.doc
     floating_quotes = []
     checklist_q = []
     regex_quotes = []
-    for match in re.finditer('(?<=")[^"]+(?=")', doc.text):
-        # ignore quotes that don't start or end with the right kind of quote char
-        if match.start()-1 not in START_GUILLEMETS:
-            continue
-        if match.end()+1 not in END_GUILLEMETS:
-            continue
-
-        if not seenBefore(match, quotations):
+    for match in context.direct_quotes:
+        if not seenBefore(match, context.quote_intervals):
             regex_quotes.append(match)
-    
-    # Create a dictionary of sentences, sentence numbers, indexed by start character
-    sentence_dict = {}
-    for i,sent in enumerate(doc.sentences):
-      sentence_dict[get_pretty_index(sent.tokens[0])[0]] = i,sent
         
     # Create a dictionary of quotes, indexed by final character
     quotation_dict = {}
@@ -586,9 +757,10 @@ def extract_floating_quotes(doc, quotations):
         indices = []
         for index in ['quote_index', 'verb_index', 'speaker_index']:
             if len(quotation[index]) > 0:
-                indices.append(eval(quotation[index])[1])
+                indices.append(quotation[index][1])
 
         quotation_dict[max(indices)] = quotation['speaker']
+    quotation_dict = PositionIndex(quotation_dict)
     
     for q in regex_quotes:
         #Note: This assumes that the speaker has been *quoted* before, which is not always the case
@@ -614,7 +786,7 @@ def extract_floating_quotes(doc, quotations):
                           'speaker': '',
                           'speaker_index': '',
                           'quote': span,
-                          'quote_index': '({0},{1})'.format(q.start()-1, q.end()+1),
+                          'quote_index': CharOffsets(q.start()-1, q.end()+1),
                           'verb': '',
                           'verb_index': '',
                           'quote_token_count': quote_token_count,
@@ -659,37 +831,29 @@ def stripWithIndices(string, start_index, end_index):
     return string, start_index, end_index
 
 
-def extract_selon_quotes(doc, previous_quotes):
+def extract_selon_quotes(context):
+    doc = context.doc
     quote_list = []
     checklist_q = []
         
-     # Create a dictionary of sentences, sentence numbers, indexed by start character
-    sentence_dict = {}
-    for i,sent in enumerate(doc.sentences):
-      sentence_dict[get_pretty_index(sent.tokens[0])[0]] = i,sent
+    # Dictionaries of sentences, sentence numbers, indexed by start character
+    sentence_dict = context.sentence_index
 
     # Named entity preprocessing
-    # Create a named entity dictionary by sentence
-    named_people_dict = {}
-    for ent in doc.ents:
-        if ent.type == 'PER':
-            named_people_dict[ent.start_char] = ent
+    # Named entity dictionary by start character
+    named_people_dict = context.named_people_index
     
     # Noun chunk search has been removed for several reasons:
     # It was mostly matching wrong noun chunks as speakers
     # and Stanza library doesn't have a module as easy to use as Spacy's for this
     
-    pronoun_dict = {}
-    for sent in doc.sentences:
-      for word in sent.words:
-        if word.pos == 'PRON':
-          pronoun_dict[get_pretty_index(word.parent)[0]] = word.parent
+    pronoun_dict = context.pronoun_index
 
     
     # Find list of quotes
     selon_quotes = []
-    for match in re.finditer("\s*([^\.\n]*([\s^](?:[sS]elon|[Dd]'après)\s)[^\.\n]*)\s*", doc.text):
-        if not seenBefore(match, previous_quotes):
+    for match in SELON_PATTERN.finditer(doc.text):
+        if not seenBefore(match, context.quote_intervals):
             selon_quotes.append(match)
     
     for q in selon_quotes:
@@ -699,11 +863,11 @@ def extract_selon_quotes(doc, previous_quotes):
         # Here, we're matching "selon" in the regex matches then looking for its head which would be the speaker (i.e: "selon le ministre")
         for w in sentence_text.words:
           if w.lemma.lower() in ["selon"]:
-            cue = get_children(sentence_text,w.parent,[])
+            cue = get_children(context,sentence_text,w.parent)
             for potential_head in sentence_text.words:
               if potential_head.id == w.head:
                 # speaker match method is a bit rough but it works fine
-                speaker_subtree = [W for W in get_children(sentence_text,potential_head.parent,[]) if (W not in cue and not W.text in [".",","])]
+                speaker_subtree = [W for W in get_children(context,sentence_text,potential_head.parent) if (W not in cue and not W.text in [".",","])]
                 speaker = get_str(speaker_subtree,doc)
 
                 # Figuring out the quote_content
@@ -721,9 +885,9 @@ def extract_selon_quotes(doc, previous_quotes):
                     if quote_token_count > 3 and is_valid_speaker:
                         quote_obj = {
                             'speaker': speaker,
-                            'speaker_index': str(get_pretty_index(speaker_subtree)),
+                            'speaker_index': get_pretty_index(speaker_subtree),
                             'quote': quote_content,
-                            'quote_index': '({0},{1})'.format(quote_content_start, quote_content_end),
+                            'quote_index': CharOffsets(quote_content_start, quote_content_end),
                             'verb': '',
                             'verb_index': '',
                             'quote_token_count': quote_token_count,
@@ -749,9 +913,9 @@ def extract_selon_quotes(doc, previous_quotes):
                     if quote_token_count > 3 and is_valid_speaker:
                         quote_obj = {
                             'speaker': speaker,
-                            'speaker_index': str(get_pretty_index(speaker_subtree)),
+                            'speaker_index': get_pretty_index(speaker_subtree),
                             'quote': quote_content,
-                            'quote_index': '({0},{1})'.format(quote_content_start, quote_content_end),
+                            'quote_index': CharOffsets(quote_content_start, quote_content_end),
                             'verb': '',
                             'verb_index': '',
                             'quote_token_count': quote_token_count,
@@ -791,9 +955,9 @@ def extract_selon_quotes(doc, previous_quotes):
             if quote_token_count >3:
                 quote_obj = {
                     'speaker': person.text,
-                    'speaker_index': '({0},{1})'.format(person.start_char, person.end_char),
+                    'speaker_index': CharOffsets(person.start_char, person.end_char),
                     'quote': quote_content,
-                    'quote_index': '({0},{1})'.format(quote_content_start, quote_content_end),
+                    'quote_index': CharOffsets(quote_content_start, quote_content_end),
                     'verb': '',
                     'verb_index': '',
                     'quote_token_count': quote_token_count,
@@ -818,9 +982,9 @@ def extract_selon_quotes(doc, previous_quotes):
             if quote_token_count >3:
                 quote_obj = {
                     'speaker': person.text,
-                    'speaker_index': '({0},{1})'.format(person.start_char, person.end_char),
+                    'speaker_index': CharOffsets(person.start_char, person.end_char),
                     'quote': quote_content,
-                    'quote_index': '({0},{1})'.format(quote_content_start, quote_content_end),
+                    'quote_index': CharOffsets(quote_content_start, quote_content_end),
                     'verb': '',
                     'verb_index': '',
                     'quote_token_count': quote_token_count,
@@ -837,22 +1001,56 @@ def extract_selon_quotes(doc, previous_quotes):
     return quote_list
 
 # ----- Quotation Extraction Functions
-def extract_quotes(doc):
-    syntactic_quotes = extract_syntactic_quotes(doc)
-    reversed_quotes = extract_reversed_quotes(doc, syntactic_quotes)
-    selon_quotes = extract_selon_quotes(doc, syntactic_quotes + reversed_quotes)
-    floating_quotes = extract_floating_quotes(doc, syntactic_quotes + reversed_quotes + selon_quotes)
+def extract_quotes(context):
+    """ Extracts the quotes of the parsed document of the DocumentContext (see DocumentContext.set_doc)
+    The indices of the quotes are (start, end) tuples, see format_indices
+    The duration of each stage is added to context.timings"""
+    # the intervals of the quotes of each stage are added to the index used by the next stages to skip the quotes already extracted
+    with timed(context.timings, 'syntactic'):
+        syntactic_quotes = extract_syntactic_quotes(context)
+        context.quote_intervals.add_quotes(syntactic_quotes)
+    with timed(context.timings, 'reversed'):
+        reversed_quotes = extract_reversed_quotes(context)
+        context.quote_intervals.add_quotes(reversed_quotes)
+    with timed(context.timings, 'selon'):
+        selon_quotes = extract_selon_quotes(context)
+        context.quote_intervals.add_quotes(selon_quotes)
+    with timed(context.timings, 'floating'):
+        floating_quotes = extract_floating_quotes(context, syntactic_quotes + reversed_quotes + selon_quotes)
     #the one-sided quote stage has been removed: it was not matching anything, and now the cases where the cue + speaker is included inside the quote are handled at the reversed quote stage
 
     return syntactic_quotes + reversed_quotes + selon_quotes + floating_quotes
 
-def quote_extractor_pipeline(doc):
-    """main function to call to extract quotes and guess the speaker's gender"""
-    doc_text = preprocess_text(doc)
-    nlped_doc = nlp(doc_text)
-    quotes = extract_quotes(doc=nlped_doc)
-    gendered_quotes = gen.genderize_quotes(quotes=quotes)
-    return gendered_quotes
+def quote_extractor_pipeline(doc, timings=None):
+    """main function to call to extract quotes and guess the speaker's gender
+    the duration of each stage (preprocessing, parse, indices, extraction stages, genderization) is added to timings if it is given"""
+    context = DocumentContext(doc)
+    with timed(context.timings, 'parse'):
+        nlped_doc = nlp(context.text)
+    context.set_doc(nlped_doc)
+    quotes = extract_quotes(context)
+    with timed(context.timings, 'genderization'):
+        gendered_quotes = gen.genderize_quotes(quotes=quotes, doc=context.doc)
+    add_timings(timings, context.timings)
+    return format_indices(gendered_quotes)
+
+def quote_extractor_pipeline_batch(docs, batch_size=16, timings=None):
+    """same as quote_extractor_pipeline for a list of texts: stanza parses batch_size texts at a time (multi-document API)"""
+    gendered_quotes_list = []
+    for i in range(0, len(docs), batch_size):
+        contexts = [DocumentContext(doc) for doc in docs[i:i + batch_size]]
+        parse_timings = {}
+        with timed(parse_timings, 'parse'):
+            nlped_docs = nlp([stanza.Document([], text=context.text) for context in contexts])
+        add_timings(timings, parse_timings)
+        for context, nlped_doc in zip(contexts, nlped_docs):
+            context.set_doc(nlped_doc)
+            quotes = extract_quotes(context)
+            with timed(context.timings, 'genderization'):
+                gendered_quotes = gen.genderize_quotes(quotes=quotes, doc=context.doc)
+            gendered_quotes_list.append(format_indices(gendered_quotes))
+            add_timings(timings, context.timings)
+    return gendered_quotes_list
 
 if __name__ == '__main__':
 
@@ -905,7 +1103,6 @@ if __name__ == '__main__':
 
             try:
                 doc_text = open(file, 'r').read()
-                doc_text = preprocess_text(doc_text)
                 quotes = quote_extractor_pipeline(doc=doc_text)
                 with open(os.path.join(OUTPUT_DIRECTORY, file_name + '.json'), 'w', encoding='utf-8') as fo:
                     json.dump(quotes, fo, indent=4, ensure_ascii=False)
@@ -922,7 +1119,6 @@ if __name__ == '__main__':
         file_name = file_name[:dot_index]
         try:
             doc_text = open(file_path, 'r').read()
-            doc_text = preprocess_text(doc_text)
             quotes = quote_extractor_pipeline(doc=doc_text)
 
             with open(os.path.join(OUTPUT_DIRECTORY, file_name + '.json'), 'w', encoding='utf-8') as fo:
@@ -3,15 +3,22 @@ This a template that can be copy/pasted to create a new processing step.
 """
 
 import typing
+import logging
 
+import gn_modules.article as gn_article
 import gn_modules.processing.processing as gn_processing
 import gn_modules.processing.processings.quote_extractor.french_pipeline.quote_extractor_fr_V2 as quote_extractor
 import gn_modules.processing.processings.quote_extractor.french_pipeline.gender_stats as gender_stats
 
+logger = logging.getLogger('genderednews.quotes')
+logger_debug = logging.getLogger('genderednews_debug.quotes')
+
+
 class Quotes(gn_processing.Processing):
     """
     The <class name> compute the <indicators> indicators.
-    ...
+    The texts of the articles are parsed by stanza BATCH_SIZE at a time (see process).
+    The time spent in each stage of the quote extraction is logged (debug level).
     """
 
     QUOTES = 'quotes'
@@ -19,22 +26,57 @@ class Quotes(gn_processing.Processing):
     MEN_COUNT = 'men_count'
     UNKNOWN_COUNT = 'unknown_count'
 
-    def __init__(self) -> None:
+    BATCH_SIZE = 16
+
+    def __init__(self, batch_size: int = None) -> None:
         self.name = 'quotes'
         self.indicators = [self.QUOTES, self.WOMEN_COUNT,
                            self.MEN_COUNT, self.UNKNOWN_COUNT]
+        self.batch_size = batch_size if batch_size else self.BATCH_SIZE
         #self.jobs_df = self.__get_jobs_df()
 
+    def get_init_kwargs(self) -> typing.Dict:
+        """The batch size is given to the processings of the worker processes (see Processing.process_in_parallel)."""
+        return {'batch_size': self.batch_size}
+
     # Depending on the level at which you want to implement the processing step (either batch articles or single article text) you can:
     # - Overwrite process_text_one_article, a method that given an article text return a dictionary of indicators
     # - Overwrite process, a method that given an Article list return a list of dictionaries of indicators
 
+    def process(self, articles: typing.List[gn_article.Article]) -> typing.List:
+        """
+        Same as the default process, but the texts of the articles are given together to the quote extractor
+        so that stanza parses them by batches of batch_size documents instead of one by one.
+        """
+
+        texts = [article.get_text() for article in articles]
+        timings = {}
+        quotes_list = quote_extractor.quote_extractor_pipeline_batch(
+            texts, batch_size=self.batch_size, timings=timings)
+        logger_debug.debug(f'Quotes of {len(articles)} articles extracted in: ' + ', '.join(
+            f'{stage} {duration:.2f}s' for stage, duration in timings.items()))
+
+        processings = []
+        article: gn_article.Article
+        for article, quotes in zip(articles, quotes_list):
+            processing = self.get_indicators(quotes)
+            logger_debug.debug(f'Article {article.link} processed...')
+            logger_debug.debug(f'... processing: {processing}')
+            processings.append(processing)
+        return processings
+
     def process_text_one_article(self, txt: str) -> typing.Dict:
         """
         ...
         """
-        # Compute your indicators here
+        # Compute your indicators here
         quotes = quote_extractor.quote_extractor_pipeline(txt)  # list of quotes
+        return self.get_indicators(quotes)
+
+    def get_indicators(self, quotes: typing.List[typing.Dict]) -> typing.Dict:
+        """
+        Return the indicators of an article given its gendered quotes.
+        """
         stats = gender_stats.get_stats(quotes) #idk we'll see
         women_count = stats["women_speakers"]
         men_count = stats["men_speakers"]
@@ -0,0 +1,59 @@
+"""
+Normalization of the article texts before they are processed.
+The patterns are compiled once, when the module is imported.
+"""
+
+import re
+import typing
+import unicodedata
+
+# Whitespace characters replacements (form feed to space, carriage return removed)
+WHITESPACE_REPLACEMENTS = (('\f', ' '), ('\r', ''))
+# Same, new lines and tabulations removed too
+WHITESPACE_REPLACEMENTS_NO_NEW_LINES = WHITESPACE_REPLACEMENTS + (('\n', ''), ('\t', ''))
+# Non-breaking space to space and typographic double quotes to straight double quotes
+SPACE_AND_QUOTES_REPLACEMENTS = (('\xa0', ' '), ('”', '"'), ('“', '"'), ('〝', '"'), ('〞', '"'))
+
+# The (?<!\w) does not change the matches (\w+ would have matched from the start of the word)
+# but avoids trying \w+ again from every character of every word
+URL_PATTERN = re.compile(r'(?:www|http)\S+|<\S+|(?<!\w)\w+\/*>')
+MULTIPLE_SPACES_PATTERN = re.compile(r' {2,}')
+
+
+def replace_all(txt: str, replacements: typing.Iterable[typing.Tuple[str, str]]) -> str:
+    """Apply the (old, new) replacements one after the other (str.replace is much faster than str.translate)."""
+    for old, new in replacements:
+        txt = txt.replace(old, new)
+    return txt
+
+
+def normalize_txt(txt, rm_new_lines=False, lower=False) -> str:
+    """
+    Normalize text: unicode NFC normalization, whitespace characters (new lines too if rm_new_lines),
+    URLs removal, multiple spaces collapse and lowercase if lower.
+    """
+
+    # Convert txt to unicode
+    if isinstance(txt, bytes):
+        txt = txt.decode(encoding='utf-8', errors='strict')
+    elif not isinstance(txt, str):
+        raise TypeError("not expecting type '%s'" % type(txt))
+
+    # Normalize unicode
+    txt = unicodedata.normalize("NFC", txt)
+
+    # Normalize whitespace characters and remove carriage return
+    txt = replace_all(
+        txt, WHITESPACE_REPLACEMENTS_NO_NEW_LINES if rm_new_lines else WHITESPACE_REPLACEMENTS)
+
+    # Remove URLs in text
+    txt = URL_PATTERN.sub('', txt)
+
+    # Remove multiple spaces
+    txt = MULTIPLE_SPACES_PATTERN.sub(' ', txt)
+
+    # to lowercase
+    if lower:
+        txt = txt.lower()
+
+    return txt
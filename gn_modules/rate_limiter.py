@@ -0,0 +1,83 @@
+"""
+Define the TokenBucket and DomainRateLimiter classes, used to throttle the requests sent to the news sources.
+"""
+
+import time
+import typing
+import logging
+import threading
+import urllib.parse
+
+logger = logging.getLogger('genderednews.rate_limiter')
+logger_debug = logging.getLogger('genderednews_debug.rate_limiter')
+
+
+class TokenBucket():
+    """
+    The TokenBucket holds at most capacity tokens and is refilled with rate tokens per second.
+    Each request takes one token: acquire blocks until a token is available.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        """Add the tokens earned since the last refill (must be called with the lock held)."""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens +
+                           (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def acquire(self) -> float:
+        """Take one token, waiting for it if necessary. Return the time waited in seconds."""
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+
+class DomainRateLimiter():
+    """
+    The DomainRateLimiter keeps one TokenBucket per domain so that each news source receives
+    at most rate requests per second (with bursts of capacity requests), whatever the number of threads.
+    """
+
+    RATE = 1
+    CAPACITY = 1
+
+    def __init__(self, rate: float = RATE, capacity: float = CAPACITY) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._buckets: typing.Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def _get_bucket(self, domain: str) -> TokenBucket:
+        """Return the bucket of a domain (created on first use)."""
+        with self._lock:
+            if domain not in self._buckets:
+                self._buckets[domain] = TokenBucket(self.rate, self.capacity)
+            return self._buckets[domain]
+
+    def acquire(self, link: str) -> float:
+        """Wait until a request to the domain of link is allowed. Return the time waited in seconds."""
+
+        domain = urllib.parse.urlsplit(link).netloc.lower()
+        waited = self._get_bucket(domain).acquire()
+        if waited:
+            logger_debug.debug(f'Request to {domain} delayed by {waited:.2f}s.')
+        return waited
+
+
+# Shared by every article so that the limit holds across processings
+download_rate_limiter = DomainRateLimiter()
@@ -5,17 +5,44 @@ Collector class.
 import abc
 import typing
 import logging
+import threading
+import collections
+import urllib.parse
+import concurrent.futures as cf
 import datetime as dt
 import newspaper as np
 
 import gn_modules.scraping_and_extraction.rss_source as gn_rss
 import gn_modules.scraping_and_extraction.twitter_source as gn_twitter
+import gn_modules.scraping_and_extraction.html_archive as gn_html_archive
 import gn_modules.article as gn_article
 from newspaper.article import ArticleException
 
 logger = logging.getLogger('genderednews.collector')
 logger_debug = logging.getLogger('genderednews_debug.collector')
 
+# Download slots per host, shared by every collector (several collectors may run at the same time)
+_HOST_SEMAPHORES: typing.Dict[str, threading.BoundedSemaphore] = {}
+_HOST_SEMAPHORES_LOCK = threading.Lock()
+
+
+def _get_host_semaphore(link: str, limit: int) -> threading.BoundedSemaphore:
+    """Return the semaphore limiting the number of simultaneous downloads on the host of the link."""
+
+    host = urllib.parse.urlparse(link).netloc
+    with _HOST_SEMAPHORES_LOCK:
+        if host not in _HOST_SEMAPHORES:
+            _HOST_SEMAPHORES[host] = threading.BoundedSemaphore(max(1, limit))
+        return _HOST_SEMAPHORES[host]
+
+
+def canonicalize_link(link: str) -> str:
+    """Return the canonical form of an article link: https scheme, lower case host, no query string nor fragment."""
+
+    parts = urllib.parse.urlsplit(link.strip())
+    scheme = 'https' if parts.scheme in ('http', 'https') else parts.scheme
+    return urllib.parse.urlunsplit((scheme, parts.netloc.lower(), parts.path, '', ''))
+
 
 class Collector(abc.ABC):
     """
@@ -28,6 +55,11 @@ class Collector(abc.ABC):
     CATEGORIES_ASSOCIATION = {}
     PREFIX_URLS = []
     BANNED_URLS = []
+    # Maximum number of articles downloaded at the same time by this collector, and per host
+    MAX_DOWNLOADS_IN_FLIGHT = 8
+    MAX_DOWNLOADS_PER_HOST = 4
+    # Keep the raw html of the collected articles (see HtmlArchive)
+    ARCHIVE_HTML = True
 
     def __init__(self, scraping_mode: str) -> None:
         if scraping_mode == "rss":
@@ -41,39 +73,121 @@ class Collector(abc.ABC):
         self.config.browser_user_agent = self.USER_AGENT
         self.config.request_timeout = 10
 
-    def scrape_and_extract_articles_from_day_to(self, from_date: dt.datetime, to_date: dt.datetime, max=1000) -> typing.List[gn_article.Article]:
+        self.archive = gn_html_archive.HtmlArchive() if self.ARCHIVE_HTML else None
+
+    def scrape_and_extract_articles_from_day_to(self, from_date: dt.datetime, to_date: dt.datetime, max=1000, max_in_flight: int = None,
+                                                known_links_lookup: typing.Callable[[typing.List[str]], typing.Set[str]] = None) -> typing.List[gn_article.Article]:
         """
         Return a list of Article from this Collector that has been published in [from_date, to_date].
         The granularity is at the level of the day.
+        The articles are downloaded in parallel (at most max_in_flight at a time, MAX_DOWNLOADS_IN_FLIGHT by default)
+        but they are parsed and returned in the order of the entries.
+        Duplicated entries and, if known_links_lookup is given, already stored links are not downloaded (see deduplicate_entries).
         """
-        entries = self.source.get_entries_from_to(from_date, to_date)
+        entries = self.deduplicate_entries(
+            self.source.get_entries_from_to(from_date, to_date), known_links_lookup)
+        if max_in_flight is None or max_in_flight < 1:
+            max_in_flight = self.MAX_DOWNLOADS_IN_FLIGHT
+
+        # Check if urls are correct (the index of the entry is kept for the max cutoff)
+        candidates = iter([(i, entry) for i, entry in enumerate(entries)
+                           if self.is_valid_link(entry['link'])])
 
         articles = []
-        for i, entry in enumerate(entries):
+        with cf.ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            in_flight = collections.deque()
+
+            def submit_next() -> None:
+                for i, entry in candidates:
+                    # The html may have already been downloaded by the source
+                    if entry.get('html'):
+                        future = cf.Future()
+                        future.set_result(entry['html'])
+                    else:
+                        future = executor.submit(
+                            self.download_html, entry['link'])
+                    in_flight.append((i, entry, future))
+                    return
 
-            # Check if url is correct
-            if not entry['link'].startswith(tuple(self.BANNED_URLS)) and entry['link'].startswith(tuple(self.PREFIX_URLS)) and len(entry['link']) > 30:
+            for _ in range(max_in_flight):
+                submit_next()
+
+            while in_flight:
+                i, entry, future = in_flight.popleft()
+                submit_next()
                 try:
+                    html = future.result()
+                    if not html:
+                        continue
                     article = self.create_article_from_link(
-                        entry['link'], entry['date'])
+                        entry['link'], entry['date'], html=html)
                 except (ArticleException, AttributeError):
                     continue
                 logger_debug.debug(f'Article extracted: {article.link}')
                 articles.append(article)
                 if i + 1 == max:
+                    for _, _, pending in in_flight:
+                        pending.cancel()
                     return articles
-            else:
-                continue
 
         return articles
 
-    def scrape_and_extract_articles_of_yesterday(self, max=1000) -> typing.List[gn_article.Article]:
+    def scrape_and_extract_articles_of_yesterday(self, max=1000,
+                                                 known_links_lookup: typing.Callable[[typing.List[str]], typing.Set[str]] = None) -> typing.List[gn_article.Article]:
         """
         Return a list of Article from this source that has been published yesterday.
         The granularity is at the level of the day.
         """
         yesterday = dt.datetime.now() - dt.timedelta(days=1)
-        return self.scrape_and_extract_articles_from_day_to(yesterday, yesterday, max)
+        return self.scrape_and_extract_articles_from_day_to(yesterday, yesterday, max, known_links_lookup=known_links_lookup)
+
+    def deduplicate_entries(self, entries: typing.List[typing.Dict],
+                            known_links_lookup: typing.Callable[[typing.List[str]], typing.Set[str]] = None) -> typing.List[typing.Dict]:
+        """
+        Return the entries without the ones whose canonical link (see canonicalize_link) has already been seen
+        (the same article is often in several feeds of a source). The first entry of an article is kept as is:
+        its link is the one of the feed, the canonical link is only the deduplication key.
+        known_links_lookup takes a list of links and returns the ones already stored (ex: DbHelper.get_existing_links),
+        the entries with such a link (original or canonical) are removed too.
+        """
+
+        unique_entries = []
+        canonical_links = []
+        seen_links = set()
+        for entry in entries:
+            canonical_link = canonicalize_link(entry['link'])
+            if canonical_link in seen_links:
+                continue
+            seen_links.add(canonical_link)
+            canonical_links.append(canonical_link)
+            unique_entries.append(entry)
+
+        if known_links_lookup and unique_entries:
+            known_links = known_links_lookup(
+                list(seen_links | {entry['link'] for entry in unique_entries}))
+            unique_entries = [entry for entry, canonical_link in zip(unique_entries, canonical_links)
+                              if entry['link'] not in known_links and canonical_link not in known_links]
+
+        logger_debug.debug(
+            f'{len(unique_entries)} new unique entries out of {len(entries)} entries.')
+        return unique_entries
+
+    def is_valid_link(self, link: str) -> bool:
+        """Check if a link can be extracted by this collector (prefix, banned urls and length)."""
+        return not link.startswith(tuple(self.BANNED_URLS)) and link.startswith(tuple(self.PREFIX_URLS)) and len(link) > 30
+
+    def download_html(self, link: str) -> str:
+        """
+        Download the html of an article, waiting for a free download slot on its host.
+        Return None if the download failed.
+        """
+        article = np.Article(link, language='fr', config=self.config)
+        with _get_host_semaphore(link, self.MAX_DOWNLOADS_PER_HOST):
+            article.download()
+        if not article.html:
+            logger_debug.debug(f'Download failed: {link}')
+            return None
+        return article.html
 
     @staticmethod
     def get_title(article: np.Article) -> str:
@@ -127,7 +241,8 @@ class Collector(abc.ABC):
         return gn_article.Article.Access.INDEFINI
 
     def create_article_from_link(self, link: str, date: dt.datetime = None, html: str = None):
-        """Creates an article ready to be stored from a link and the source name."""
+        """Creates an article ready to be stored from a link and the source name.
+        The html of the article is archived (see HtmlArchive) before being parsed."""
 
         # Download and parse an article from its link
         article = np.Article(link, language='fr', config=self.config)
@@ -135,6 +250,8 @@ class Collector(abc.ABC):
             article.set_html(html)
         else:
             article.download()
+        if self.archive:
+            self.archive.put(link, article.html)
         article.parse()
 
         # Get all info from the parsed article
@@ -0,0 +1,117 @@
+"""
+CollectorScheduler class.
+"""
+
+import time
+import typing
+import logging
+import datetime as dt
+import concurrent.futures as cf
+
+import gn_modules.article as gn_article
+import gn_modules.scraping_and_extraction.collector as gn_collector
+
+logger = logging.getLogger('genderednews.collector_scheduler')
+logger_debug = logging.getLogger('genderednews_debug.collector_scheduler')
+
+
+class CollectorScheduler():
+    """
+    The CollectorScheduler runs several collectors at the same time (one thread per collector)
+    so that a slow news source does not delay the others.
+    The articles of each collector are handed over as soon as this collector has finished,
+    and a report (articles count and duration per source) is logged at the end.
+    """
+
+    def __init__(self, collectors: typing.List[typing.Type[gn_collector.Collector]], scraping_mode: str, max_workers: int = None,
+                 known_links_lookup: typing.Callable[[typing.List[str]], typing.Set[str]] = None) -> None:
+        self.collectors = collectors
+        self.scraping_mode = scraping_mode
+        self.max_workers = max_workers if max_workers else max(1, len(collectors))
+        # Returns the links already stored, which are not downloaded again (see Collector.deduplicate_entries)
+        self.known_links_lookup = known_links_lookup
+
+    def _run_collector(self, collector_class: typing.Type[gn_collector.Collector], from_date: dt.datetime, to_date: dt.datetime, max: int,
+                       durations: typing.Dict[str, float]) -> typing.List[gn_article.Article]:
+        """
+        Instanciate a collector and return the articles it scraped and extracted.
+        The duration of the collector (failed or not) is recorded in durations when it ends,
+        so that it does not include the time spent waiting for the articles of other sources to be handed over.
+        """
+
+        start_time = time.monotonic()
+        logger.info(
+            f'Scraping and extracting articles from \'{collector_class.NAME}\'... (this may take a while)')
+        logger_debug.info(
+            f'Scraping and extracting articles from \'{collector_class.NAME}\'...')
+
+        # Instanciated in the worker thread: the twitter authentication is a network call too
+        try:
+            collector = collector_class(scraping_mode=self.scraping_mode)
+            return collector.scrape_and_extract_articles_from_day_to(from_date, to_date, max,
+                                                                     known_links_lookup=self.known_links_lookup)
+        finally:
+            durations[collector_class.NAME] = time.monotonic() - start_time
+
+    def scrape_and_extract_articles_from_day_to(self, from_date: dt.datetime, to_date: dt.datetime,
+                                                on_articles: typing.Callable[[str, typing.List[gn_article.Article]], None],
+                                                max=1000) -> typing.Dict[str, typing.Dict]:
+        """
+        Run every collector on [from_date, to_date] and call on_articles(source_name, articles)
+        each time a collector has finished (in the calling thread, in order of completion).
+        Return a report: for each source name, a dict with the 'articles' count, the 'duration' in seconds
+        and the 'error' that stopped the collector (None if it succeeded).
+        """
+
+        report = {}
+        durations = {}
+        with cf.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {}
+            for collector_class in self.collectors:
+                futures[executor.submit(self._run_collector, collector_class,
+                                        from_date, to_date, max, durations)] = collector_class.NAME
+
+            for future in cf.as_completed(futures):
+                source_name = futures[future]
+                duration = durations[source_name]
+                try:
+                    articles = future.result()
+                except Exception as error:
+                    logger.exception(f'Scraping of \'{source_name}\' failed.')
+                    logger_debug.exception(
+                        f'Scraping of \'{source_name}\' failed.')
+                    report[source_name] = {
+                        'articles': 0, 'duration': duration, 'error': repr(error)}
+                    continue
+
+                logger.info(
+                    f'{len(articles)} articles scraped and extracted from \'{source_name}\' in {duration:.1f}s.')
+                logger_debug.info(
+                    f'{len(articles)} articles scraped and extracted from \'{source_name}\' in {duration:.1f}s.')
+                report[source_name] = {
+                    'articles': len(articles), 'duration': duration, 'error': None}
+                on_articles(source_name, articles)
+
+        self.log_report(report)
+        return report
+
+    def scrape_and_extract_articles_of_yesterday(self, on_articles: typing.Callable[[str, typing.List[gn_article.Article]], None],
+                                                 max=1000) -> typing.Dict[str, typing.Dict]:
+        """
+        Run every collector on the articles published yesterday, see scrape_and_extract_articles_from_day_to.
+        The granularity is at the level of the day.
+        """
+        yesterday = dt.datetime.now() - dt.timedelta(days=1)
+        return self.scrape_and_extract_articles_from_day_to(yesterday, yesterday, on_articles, max)
+
+    @staticmethod
+    def log_report(report: typing.Dict[str, typing.Dict]) -> None:
+        """Log the articles count and the duration of each source, slowest first."""
+
+        logger.info('Scraping summary (source: articles, duration):')
+        for source_name, source_report in sorted(report.items(), key=lambda item: -item[1]['duration']):
+            status = f' - FAILED: {source_report["error"]}' if source_report['error'] else ''
+            logger.info(
+                f'\t{source_name}: {source_report["articles"]} articles, {source_report["duration"]:.1f}s{status}')
+            logger_debug.info(
+                f'\t{source_name}: {source_report["articles"]} articles, {source_report["duration"]:.1f}s{status}')
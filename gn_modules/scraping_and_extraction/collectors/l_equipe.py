@@ -4,7 +4,6 @@ L'Equipe Collector.
 
 import typing
 import newspaper as np
-from urllib.request import urlopen
 import bs4 as bs
 
 from gn_modules.article import Article
@@ -66,10 +65,9 @@ class LEquipe(gn_collector.Collector):
 
     @staticmethod
     def get_text(article: np.Article):
-        """Get text from the article"""
+        """Get text from the article (from its html, downloaded or read from the archive)"""
         text = ""
-        html = urlopen(article.url).read()
-        page = bs.BeautifulSoup(html, features="html.parser")
+        page = bs.BeautifulSoup(article.html, features="html.parser")
         for paragraph in page.find_all('p'):
             text += "\n" + paragraph.getText()
         return text
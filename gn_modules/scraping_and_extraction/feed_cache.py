@@ -0,0 +1,87 @@
+"""
+Define the FeedCache class, a persistent cache of the rss feeds.
+"""
+
+import os
+import json
+import typing
+import hashlib
+import logging
+import threading
+import datetime as dt
+
+logger = logging.getLogger('genderednews.feed_cache')
+logger_debug = logging.getLogger('genderednews_debug.feed_cache')
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FeedCache():
+    """
+    The FeedCache stores on disk, for each rss feed url, the ETag and Last-Modified headers of its last response
+    along with the entries (dict with 'link' & 'date') found in it.
+    The headers are sent back with the next request of the feed (conditional GET): when the feed has not changed
+    the server answers 304 Not Modified and the cached entries are used instead of parsing the feed again.
+    The cache is in the FEED_CACHE_DIRECTORY environment variable directory, cache/rss_feeds of the project by default,
+    the directory is created when the first feed is stored.
+    """
+
+    DIRECTORY = os.environ.get('FEED_CACHE_DIRECTORY', os.path.join(PROJECT_ROOT, 'cache', 'rss_feeds'))
+
+    def __init__(self, directory: str = DIRECTORY) -> None:
+        self.directory = directory
+
+        # Number of feeds answered with a 304 (hits) or downloaded in full (misses)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _get_path(self, feed_link: str) -> str:
+        """Return the path of the cache file of a feed."""
+        key = hashlib.sha1(feed_link.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f'{key}.json')
+
+    def get(self, feed_link: str) -> typing.Optional[typing.Dict]:
+        """
+        Return the cached response of a feed (dict with 'etag', 'modified' & 'entries')
+        or None if the feed is not in the cache.
+        """
+
+        try:
+            with open(self._get_path(feed_link), 'r', encoding='utf-8') as cache_file:
+                cached = json.load(cache_file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+        cached['entries'] = [{'link': entry['link'], 'date': dt.datetime.fromisoformat(entry['date'])}
+                             for entry in cached['entries']]
+        return cached
+
+    def set(self, feed_link: str, etag: str, modified: str, entries: typing.List[typing.Dict]) -> None:
+        """Store the validators (ETag and Last-Modified) and the entries of a feed."""
+
+        cached = {
+            'link': feed_link,
+            'etag': etag,
+            'modified': modified,
+            'entries': [{'link': entry['link'], 'date': entry['date'].isoformat()}
+                        for entry in entries],
+        }
+
+        # Write in a temporary file first so that a feed is never half written
+        path = self._get_path(feed_link)
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as cache_file:
+            json.dump(cached, cache_file)
+        os.replace(tmp_path, path)
+
+    def record_hit(self) -> None:
+        """Count a feed that has not been modified since it was cached."""
+        with self._lock:
+            self.hits += 1
+
+    def record_miss(self) -> None:
+        """Count a feed that has been downloaded and parsed."""
+        with self._lock:
+            self.misses += 1
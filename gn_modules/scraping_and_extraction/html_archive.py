@@ -0,0 +1,62 @@
+"""
+Define the HtmlArchive class, a compressed store of the raw html of the articles.
+"""
+
+import os
+import gzip
+import typing
+import hashlib
+import logging
+import threading
+
+logger = logging.getLogger('genderednews.html_archive')
+logger_debug = logging.getLogger('genderednews_debug.html_archive')
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class HtmlArchive():
+    """
+    The HtmlArchive stores the raw html of the collected articles, gzip compressed, in a file named after
+    the hash of the article link (<directory>/<first 2 hex digits>/<sha256 of the link>.html.gz).
+    It allows to re-extract the articles without downloading them again (and after their link is dead).
+    An archived html is never overwritten: the archive keeps the page as it was when it was first collected.
+    The archive is in the HTML_ARCHIVE_DIRECTORY environment variable directory, archive/html of the project by default.
+    """
+
+    DIRECTORY = os.environ.get('HTML_ARCHIVE_DIRECTORY', os.path.join(PROJECT_ROOT, 'archive', 'html'))
+
+    def __init__(self, directory: str = DIRECTORY) -> None:
+        self.directory = directory
+
+    def _get_path(self, link: str) -> str:
+        """Return the path of the archive file of a link."""
+        key = hashlib.sha256(link.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, key[:2], f'{key}.html.gz')
+
+    def __contains__(self, link: str) -> bool:
+        return os.path.isfile(self._get_path(link))
+
+    def put(self, link: str, html: str) -> None:
+        """Archive the html of a link, unless it has already been archived."""
+
+        path = self._get_path(link)
+        if not html or os.path.isfile(path):
+            return
+
+        # Write in a temporary file first so that an archive file is never half written
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as archive_file:
+            archive_file.write(html)
+        os.replace(tmp_path, path)
+        logger_debug.debug(f'Html archived: {link}')
+
+    def get(self, link: str) -> typing.Optional[str]:
+        """Return the archived html of a link or None if it has not been archived."""
+
+        try:
+            with gzip.open(self._get_path(link), 'rt', encoding='utf-8') as archive_file:
+                return archive_file.read()
+        except FileNotFoundError:
+            return None
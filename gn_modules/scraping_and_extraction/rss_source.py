@@ -6,23 +6,66 @@ import datetime as dt
 import time
 import typing
 import logging
+import urllib.request
+import http.client
+import concurrent.futures as cf
 import feedparser
 import newspaper as np
 from newspaper.article import ArticleException
 
+import gn_modules.scraping_and_extraction.feed_cache as gn_feed_cache
+
 logger = logging.getLogger('genderednews.rss_source')
 logger_debug = logging.getLogger('genderednews_debug.rss_source')
 
 
+class _TimeoutHTTPHandler(urllib.request.HTTPHandler):
+    """HTTP handler giving a timeout to the requests made by feedparser."""
+
+    def __init__(self, timeout: float) -> None:
+        super().__init__()
+        self.timeout = timeout
+
+    def http_open(self, req):
+        req.timeout = self.timeout
+        return super().http_open(req)
+
+
+class _TimeoutHTTPSHandler(urllib.request.HTTPSHandler):
+    """HTTPS handler giving a timeout to the requests made by feedparser."""
+
+    def __init__(self, timeout: float) -> None:
+        super().__init__()
+        self.timeout = timeout
+
+    def https_open(self, req):
+        req.timeout = self.timeout
+        return super().https_open(req)
+
+
 class RssSource():
     """
     The class Source is responsible for extracting links from rss feeds.
+    The rss feeds are fetched in parallel (max_workers feeds at a time),
+    each feed request times out after feed_timeout seconds.
+    Unchanged feeds are not parsed again thanks to the feed_cache (see FeedCache).
     """
     USER_AGENT = 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/44.0.2403.157 Safari/537.36'
+    MAX_WORKERS = 8
+    FEED_TIMEOUT = 10
+    USE_FEED_CACHE = True
 
-    def __init__(self, rss_feed_links: typing.List[str], source_name: str) -> None:
+    def __init__(self, rss_feed_links: typing.List[str], source_name: str, max_workers: int = None, feed_timeout: float = None,
+                 feed_cache: gn_feed_cache.FeedCache = None) -> None:
         self.rss_feed_links = rss_feed_links
         self.name = source_name
+        self.max_workers = max_workers if max_workers else self.MAX_WORKERS
+        self.feed_timeout = feed_timeout if feed_timeout else self.FEED_TIMEOUT
+
+        # Persistent cache of the feeds (conditional GET), disabled if USE_FEED_CACHE is False
+        if feed_cache is None and self.USE_FEED_CACHE:
+            feed_cache = gn_feed_cache.FeedCache()
+        self.feed_cache = feed_cache
 
         # Config newspaper (to avoid read time out error)
         self.config = np.Config()
@@ -32,12 +75,31 @@ class RssSource():
     def _scrape_one_xml(self, source_link: str) -> typing.List[typing.Dict]:
         """
         Scrape all the articles links from one xml RSS feed.
+        Return an array of entries (dict with 'link' & 'date', and 'html' if the article had to be downloaded).
+        If the feed has not been modified since it was cached, the cached entries are returned.
         """
 
-        # Parse the xml file
-        rss_feed = feedparser.parse(source_link)
-
+        # Parse the xml file (conditional GET if the feed is in the cache)
+        # (a feed that cannot be fetched, e.g. timed out, is ignored so that the other feeds are still merged)
+        cached = self.feed_cache.get(source_link) if self.feed_cache else None
+        try:
+            rss_feed = feedparser.parse(source_link,
+                                        etag=cached['etag'] if cached else None,
+                                        modified=cached['modified'] if cached else None,
+                                        handlers=[_TimeoutHTTPHandler(self.feed_timeout), _TimeoutHTTPSHandler(self.feed_timeout)])
+        except (OSError, http.client.HTTPException) as error:
+            logger_debug.debug(f'Feed not fetched: {source_link} ({error!r})')
+            return []
+
+        # The feed has not changed: feedparser stops before parsing anything
+        if cached and rss_feed.get('status') == 304:
+            self.feed_cache.record_hit()
+            logger_debug.debug(f'Feed not modified: {source_link}')
+            return cached['entries']
+
+        entries = []
         for entry in rss_feed.entries:
+            html = None
             # Check if there are missing links
             try:
                 if not entry.link:
@@ -52,43 +114,53 @@ class RssSource():
                     time.mktime(entry.published_parsed))
 
             # Retrieve published date in the metadata of the article
+            # (the html is kept with the entry so that the collector does not download it again)
             except (AttributeError, KeyError):
                 article = np.Article(
                     entry.link, language='fr', config=self.config)
                 try:
                     article.download()
                     article.parse()
+                    html = article.html
+                    entry.datetime = article.publish_date.replace(tzinfo=None)
                 except ArticleException:
                     # Ignore this article (article url not working)
                     entry.datetime = dt.datetime.now() - dt.timedelta(days=10)
-                    continue
-                try:
-                    entry.datetime = article.publish_date.replace(tzinfo=None)
                 except AttributeError:
                     # Ignore this article (publish_date == None)
                     entry.datetime = dt.datetime.now() - dt.timedelta(days=10)
-                    continue
 
-        # Return the entries published yesterday
-        return rss_feed.entries
+            entries.append({'link': entry.link, 'date': entry.datetime})
+            if html:
+                entries[-1]['html'] = html
+
+        if self.feed_cache and rss_feed.get('status') == 200:
+            self.feed_cache.record_miss()
+            if rss_feed.get('etag') or rss_feed.get('modified'):
+                self.feed_cache.set(source_link, rss_feed.get(
+                    'etag'), rss_feed.get('modified'), entries)
+
+        return entries
 
     def scrape_all_xml(self) -> typing.List[typing.Dict]:
         """
         Return an array of all entries (dict with 'link' & 'date') from this source.
+        The feeds are fetched in parallel, their entries are merged in the order of rss_feed_links.
         """
 
+        with cf.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            newsfeeds = list(executor.map(
+                self._scrape_one_xml, self.rss_feed_links))
+
         article_entries = []
-        for feed in self.rss_feed_links:
-            newsfeed = self._scrape_one_xml(feed)
+        for newsfeed in newsfeeds:
             for entry in newsfeed:
-                try:
-                    if entry.link:
-                        logger_debug.debug(f'Article found: {entry.link}')
-                        article_entries.append(
-                            {'link': entry.link, 'date': entry.datetime})
-                except AttributeError:
-                    continue
+                logger_debug.debug(f'Article found: {entry["link"]}')
+                article_entries.append(entry)
         logger_debug.debug(f'{len(article_entries)} articles found.')
+        if self.feed_cache:
+            logger_debug.debug(
+                f'Feed cache: {self.feed_cache.hits} feeds not modified, {self.feed_cache.misses} feeds downloaded.')
 
         return article_entries
 
@@ -6,6 +6,7 @@ Example that:
 - process the unprocessed articles
 """
 
+import os
 import logging
 import datetime as dt
 import tracemalloc
@@ -15,6 +16,7 @@ import gn_modules.secure_dotenv as gn_dotenv
 import gn_modules.scraping_and_extraction.collector as gn_collector
 import gn_modules.processing.config_processings as gn_processing
 import gn_modules.scraping_and_extraction.config_collectors as gn_collector
+import gn_modules.scraping_and_extraction.collector_scheduler as gn_scheduler
 import gn_modules.article as gn_article
 import gn_modules.misc as gn_misc
 
@@ -33,6 +35,8 @@ if __name__ == '__main__':
 
     # Load environment variables
     db_info = gn_dotenv.load_dotenv_secure()
+    # Number of processes used by the processings (opt-in, 1 by default)
+    n_jobs = int(os.environ.get('PROCESSING_N_JOBS', 1))
 
     # Connect to database
     db_helper = gn_db.DbHelper()
@@ -50,25 +54,22 @@ if __name__ == '__main__':
     logger_debug.info(
         '--------------------------------------------------------------')
 
-    for collector in gn_collector.collectors.values():
-        # Instanciate class
-        # There are 2 methods for scraping: via rss feeds or via twitter tweets
-        collector = collector(scraping_mode="twitter")
-        logger.info(
-            f'Scraping and extracting yesterday\'s articles from \'{collector.source.name}\'... (this may take a while)')
-        logger_debug.info(
-            f'Scraping and extracting yesterday\'s articles from \'{collector.source.name}\'...')
+    # All the collectors run at the same time, their articles are inserted as soon as each one has finished
+    # There are 2 methods for scraping: via rss feeds or via twitter tweets
+    # Articles already in the database are not downloaded again
+    scheduler = gn_scheduler.CollectorScheduler(
+        list(gn_collector.collectors.values()), scraping_mode="twitter",
+        known_links_lookup=db_helper.get_existing_links)
 
-        # Scrape and extract articles
-        articles = collector.scrape_and_extract_articles_of_yesterday()
-        logger.info(
-            f'{len(articles)} articles scraped and extracted (there may be duplicates).')
+    def insert_articles(source_name, articles):
+        """Insert the extracted articles of one source."""
         logger_debug.info(
-            f'{len(articles)} articles scraped and extracted (there may be duplicates).')
-
-        # Insert extracted articles
+            f'Inserting {len(articles)} new articles from \'{source_name}\'.')
         db_helper.insert_or_update_articles(articles)
 
+    # Scrape, extract and insert articles
+    scheduler.scrape_and_extract_articles_of_yesterday(insert_articles)
+
     # ----- 2. Retrieve & process non-processed articles -----
 
     logger.info('')
@@ -94,7 +95,7 @@ if __name__ == '__main__':
         processing = processing()  # Instanciate the class
         logger.info(f'Starting the {processing.name} processing.')
         logger_debug.info(f'Starting the {processing.name} processing.')
-        articles = processing.apply_on(articles)
+        articles = processing.apply_on(articles, n_jobs=n_jobs)
     logger.info('Articles processed.')
     logger_debug.info('Articles processed.')
 
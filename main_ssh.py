@@ -3,6 +3,7 @@ Example that:
 - process the quotes unprocessed articles
 """
 
+import os
 import logging
 import datetime as dt
 import tracemalloc
@@ -30,6 +31,8 @@ if __name__ == '__main__':
 
     # Load environment variables
     db_info = gn_dotenv.load_dotenv_secure()
+    # Number of processes used by the processings (opt-in, 1 by default)
+    n_jobs = int(os.environ.get('PROCESSING_N_JOBS', 1))
 
     # Connect to database via ssh
     db_helper = gn_db.DbHelper(mode="ssh")
@@ -59,7 +62,7 @@ if __name__ == '__main__':
     # Process the articles
     logger.info(f'Starting the {quotes.name} processing.')
     logger_debug.info(f'Starting the {quotes.name} processing.')
-    articles = quotes.apply_on(articles)
+    articles = quotes.apply_on(articles, n_jobs=n_jobs)
     logger.info('Articles processed.')
     logger_debug.info('Articles processed.')
 
@@ -0,0 +1,195 @@
+"""
+Benchmarks of the processing steps that have been optimized for speed (time per call of the current code,
+and of the former code when a copy of it is kept here, see the _legacy_ functions).
+The equivalence of the optimized code with the former one is checked by the tests.
+Run it with: python -m scripts.benchmark <benchmark> [arguments], the benchmarks are:
+- genderization [number of repetitions]: title and pronoun rules of the genderization (match_speaker) and remove_titles,
+  per speaker, before and after
+- normalization [folder of .txt files]: normalize_txt on real article texts, read from the .txt files of the folder
+  if one is given, otherwise extracted from the html archive of the collectors (see HtmlArchive)
+- quote_lookups [number of sentences]...: position lookups of the quote extractor on synthetic long articles,
+  a sentence of 120 characters, a person every 3 sentences, 2 pronouns per sentence and a regex quote every 5 sentences,
+  before (scan of every position) and after (binary search in a PositionIndex)
+"""
+
+import re
+import os
+import sys
+import glob
+import gzip
+import timeit
+import typing
+
+SPEAKERS = [
+    'Emmanuel Macron', 'le président de la République', 'M. Dupont', 'Mme Marie Dupont', 'il', 'elle',
+    'la ministre de la Santé', 'Jean-Pierre Martin, maire de la ville', 'Monsieur le Préfet', 'Sœur Marie',
+    'le Dr Martin', 'un porte-parole du ministère', 'Mlle Durand', 'lui', 'les syndicats',
+]
+
+
+def time_per_call(function: typing.Callable, inputs: typing.List, number: int) -> float:
+    """Return the mean duration (in seconds) of a call of function on each of the inputs, over number repetitions."""
+    duration = timeit.timeit(lambda: [function(item) for item in inputs], number=number)
+    return duration / (number * len(inputs))
+
+
+def _legacy_check_title(speaker):
+    """check_title before match_speaker (the patterns were built at each call)."""
+    title_gender = None
+    honorifics_M = r"|".join(["Mr", "M(\.)?","Monsieur","Sir", "Père", "Frère"])
+    honorifics_F = r"|".join(["Ms", "Mrs", "Miss", "Madame","Mme", "Mlle", "Mademoiselle","Mère","Sœur"])
+    if re.search(re.compile(r"\b({})\b".format(honorifics_M)), speaker) is not None:
+        title_gender = 1
+    elif re.search(re.compile(r"\b({})\b".format(honorifics_F)), speaker) is not None:
+        title_gender = 0
+    return title_gender
+
+
+def _legacy_check_pronoun(speaker):
+    """check_pronoun before match_speaker."""
+    pron_gender = None
+    if re.search("(\b|^)(-?([Ii]l(s)?)|lui)\.?(\b|$)",speaker) is not None:
+        pron_gender = 1
+    elif re.search("(\b|^)(-?[Ee]lle(s)?)\.?(\b|$)",speaker) is not None:
+        pron_gender = 0
+    return pron_gender
+
+
+def _legacy_remove_titles(txt):
+    """remove_titles before TITLES_PATTERN (the pattern was built at each call)."""
+    honorifics = ["Mr", "Ms", "Mrs", "Miss", "Dr", "Sir", "Dame", "Hon", "Professor",
+                  "Prof", "Rev", "Me", "M(\.)?","Monsieur", "Madame","Mme", "Mlle", "Mademoiselle"]
+    titles = ["QC", "CBE", "MBE", "BM", "MD", "DM", "BHB", "CBC",
+              "Reverend", "Recorder", "Headteacher", "Councillor", "Cllr", "Father", "Fr",
+              "Mother", "Grandmother", "Grandfather", "Creator", "Père", "Frère", "S(œ|oe)ur","Mère","Grand-père", "Grand-mère"]
+    extras = ["et al", "www", "href", "http", "https", "Ref", "rel", "eu", "span", "Rd", "St"]
+    banned_words = r'|'.join(honorifics + titles + extras)
+    pattern = re.compile(r'\b({})\b'.format(banned_words))
+    txt = pattern.sub('', txt)
+    return txt.strip()
+
+
+def benchmark_genderization(number: int = 2000) -> None:
+    """Time the title and pronoun rules and remove_titles on SPEAKERS, before and after."""
+    import gn_modules.processing.processings.quote_extractor.french_pipeline.genderization as gen
+
+    before = time_per_call(lambda speaker: (_legacy_check_title(speaker), _legacy_check_pronoun(speaker)), SPEAKERS, number)
+    after = time_per_call(gen.match_speaker, SPEAKERS, number)
+    print(f'title and pronoun rules: {before * 1e6:.2f} µs per speaker before (check_title and check_pronoun), '
+          f'{after * 1e6:.2f} µs after (match_speaker)')
+    before = time_per_call(_legacy_remove_titles, SPEAKERS, number)
+    after = time_per_call(gen.remove_titles, SPEAKERS, number)
+    print(f'remove_titles: {before * 1e6:.2f} µs per speaker before, {after * 1e6:.2f} µs after')
+
+
+def read_texts(folder: str = None) -> typing.List[str]:
+    """Return the texts of the .txt files of folder, or of the articles of the html archive."""
+    import newspaper as np
+    import gn_modules.scraping_and_extraction.html_archive as gn_html_archive
+
+    texts = []
+    if folder:
+        for path in sorted(glob.glob(os.path.join(folder, '*.txt'))):
+            with open(path, 'r', encoding='utf-8') as text_file:
+                texts.append(text_file.read())
+        return texts
+
+    for path in sorted(glob.glob(os.path.join(gn_html_archive.HtmlArchive.DIRECTORY, '*', '*.html.gz'))):
+        with gzip.open(path, 'rt', encoding='utf-8') as archive_file:
+            article = np.Article('', language='fr')
+            article.download(input_html=archive_file.read())
+            article.parse()
+            texts.append(article.text)
+    return texts
+
+
+def benchmark_normalization(folder: str = None, number: int = 20) -> None:
+    """Time normalize_txt on the texts of read_texts."""
+    import gn_modules.processing.text_normalization as gn_text_normalization
+
+    texts = [text for text in read_texts(folder) if text]
+    if not texts:
+        print('No text found.')
+        return
+    n_chars = sum(len(text) for text in texts)
+    duration = time_per_call(gn_text_normalization.normalize_txt, texts, number)
+    print(f'{len(texts)} texts, {n_chars / len(texts):.0f} characters on average.')
+    print(f'normalize_txt: {duration * 1e6:.1f} µs per text, '
+          f'{n_chars / len(texts) / duration / 1e6:.1f} M characters per second')
+
+
+def build_article(n_sentences: int, sentence_length: int = 120) -> typing.Tuple[typing.List[typing.Dict], typing.List]:
+    """Return the sentence, people, pronoun and quotation dicts and the regex quotes (start, end) of a synthetic article."""
+    sentence_dict = {i * sentence_length: (i, None) for i in range(n_sentences)}
+    named_people_dict = {i * sentence_length + 40: None for i in range(0, n_sentences, 3)}
+    pronoun_dict = {i * sentence_length + offset: None for i in range(n_sentences) for offset in (10, 80)}
+    quotation_dict = {i * sentence_length + 100: '' for i in range(0, n_sentences, 4)}
+    regex_quotes = [(i * sentence_length + 5, i * sentence_length + 60) for i in range(0, n_sentences, 5)]
+    return [sentence_dict, named_people_dict, pronoun_dict, quotation_dict], regex_quotes
+
+
+def _legacy_getSentenceNumber(sentence_dict, char):
+    """getSentenceNumber before PositionIndex (scan of every sentence)."""
+    keys_subset = [k for k in sentence_dict.keys() if k <= char]
+    assert len(keys_subset) > 0
+    sentence_char = max(keys_subset)
+    return sentence_dict[sentence_char]
+
+
+def _legacy_getClosestPreceding(preceding_dict, char):
+    """getClosestPreceding before PositionIndex (scan of every position)."""
+    keys_subset = [k for k in preceding_dict.keys() if k <= char]
+    if len(keys_subset) > 0:
+        return max(keys_subset)
+    else:
+        return -1
+
+
+def _legacy_getClosestFollowing(following_dict, char):
+    """getClosestFollowing before PositionIndex (scan of every position)."""
+    keys_subset = [k for k in following_dict.keys() if k >= char]
+    if len(keys_subset) > 0:
+        return min(keys_subset)
+    else:
+        return -1
+
+
+def benchmark_quote_lookups(*sizes: int) -> None:
+    """Time the position lookups of the quote extractor on synthetic articles of the given numbers of sentences, before and after."""
+    import gn_modules.processing.processings.quote_extractor.french_pipeline.quote_extractor_fr_V2 as qe
+
+    def lookups(article, index, get_sentence_number, get_closest_preceding, get_closest_following):
+        """The lookups of the reversed, selon and floating stages for every regex quote (indices built included)."""
+        dicts, regex_quotes = article
+        sentence_dict, named_people_dict, pronoun_dict, quotation_dict = [index(d) for d in dicts]
+        for start, end in regex_quotes:
+            get_sentence_number(sentence_dict, start)
+            get_sentence_number(sentence_dict, end)
+            get_closest_following(named_people_dict, end)
+            get_closest_following(pronoun_dict, end)
+            get_closest_following(named_people_dict, start)
+            get_closest_following(pronoun_dict, start)
+            get_closest_preceding(quotation_dict, start)
+
+    for n_sentences in sizes or (50, 200, 1000):
+        article = build_article(n_sentences)
+        before = time_per_call(lambda article: lookups(article, dict, _legacy_getSentenceNumber,
+                                                       _legacy_getClosestPreceding, _legacy_getClosestFollowing), [article], 5)
+        after = time_per_call(lambda article: lookups(article, qe.PositionIndex, qe.getSentenceNumber,
+                                                      qe.getClosestPreceding, qe.getClosestFollowing), [article], 20)
+        print(f'{n_sentences} sentences, {7 * len(article[1])} lookups: '
+              f'{before * 1e3:.2f} ms per article before, {after * 1e3:.2f} ms after')
+
+
+BENCHMARKS = {
+    'genderization': lambda args: benchmark_genderization(*[int(arg) for arg in args]),
+    'normalization': lambda args: benchmark_normalization(*args),
+    'quote_lookups': lambda args: benchmark_quote_lookups(*[int(arg) for arg in args]),
+}
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2 or sys.argv[1] not in BENCHMARKS:
+        print(f'Usage: python -m scripts.benchmark <{"|".join(BENCHMARKS)}> [arguments]')
+        sys.exit(1)
+    BENCHMARKS[sys.argv[1]](sys.argv[2:])
@@ -1,7 +1,9 @@
 """
 A simple script that re extract and re process every articles in the database.
+Run it with --from-archive to read the articles html from the html archive instead of downloading them.
 """
 
+import sys
 import datetime as dt
 
 from gn_modules.secure_dotenv import load_dotenv_secure
@@ -14,4 +16,5 @@ logger = initialize_logger(
 load_dotenv_secure()
 db_helper = DbHelper(mode="localhost")
 
-db_helper.re_extract_and_process_everything()
+db_helper.re_extract_and_process_everything(
+    from_archive='--from-archive' in sys.argv[1:])
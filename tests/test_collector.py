@@ -3,6 +3,10 @@ Unit tests for Collector module.
 """
 
 import datetime as dt
+import pytest
+
+import gn_modules.scraping_and_extraction.collector as gn_collector
+import gn_modules.scraping_and_extraction.html_archive as gn_html_archive
 import gn_modules.scraping_and_extraction.collectors.le_monde as gn_le_monde
 
 
@@ -14,6 +18,12 @@ URL = "https://www.lemonde.fr/international/article/2021/03/10/relations-entre-l
 LE_MONDE = gn_le_monde.LeMonde(scraping_mode='rss')
 
 
+@pytest.fixture(scope='module', autouse=True)
+def archive_in_tmp_path(tmp_path_factory):
+    """Archive the html of the articles collected by the tests in a temporary directory"""
+    LE_MONDE.archive = gn_html_archive.HtmlArchive(str(tmp_path_factory.mktemp('html')))
+
+
 class TestScrapeAndExtractArticlesFromDayTo():
     """Test scrape_and_extract_articles_from_day_to function"""
 
@@ -71,3 +81,51 @@ class TestCreateArticleFromLink():
     def test_article_created_is_valid(self):
         """Check if the article created is valid"""
         self.article.check_valid()
+
+
+class TestDeduplicateEntries():
+    """Test canonicalize_link and deduplicate_entries functions"""
+
+    def test_canonicalize_link(self):
+        """Check if the scheme, query string and fragment are normalized"""
+        assert gn_collector.canonicalize_link(
+            'http://www.LeMonde.fr/article.html?xtor=RSS-3208#comments') == 'https://www.lemonde.fr/article.html'
+
+    def test_deduplicate_entries(self):
+        """Check if an article found in several feeds is kept once"""
+        entries = [{'link': URL, 'date': DATE},
+                   {'link': URL + '?xtor=RSS-3208', 'date': DATE},
+                   {'link': URL.replace('https', 'http'), 'date': DATE}]
+        entries = LE_MONDE.deduplicate_entries(entries)
+        assert [entry['link'] for entry in entries] == [URL]
+
+    def test_deduplicate_keeps_original_links(self):
+        """Check if the links of the entries kept are not rewritten to their canonical form"""
+        http_url = URL.replace('https', 'http') + '?page=2'
+        entries = [{'link': http_url, 'date': DATE}, {'link': URL, 'date': DATE}]
+        entries = LE_MONDE.deduplicate_entries(entries)
+        assert [entry['link'] for entry in entries] == [http_url]
+
+    def test_deduplicate_known_entries(self):
+        """Check if the links already stored are removed"""
+        entries = [{'link': URL, 'date': DATE}]
+        entries = LE_MONDE.deduplicate_entries(
+            entries, lambda links: set(links))
+        assert entries == []
+
+
+class TestHtmlArchive():
+    """Test the HtmlArchive used by create_article_from_link"""
+
+    def test_put_and_get(self, tmp_path):
+        """Check if an archived html can be read and is never overwritten"""
+        archive = gn_html_archive.HtmlArchive(str(tmp_path))
+        archive.put(URL, '<html>première version</html>')
+        archive.put(URL, '<html>seconde version</html>')
+        assert URL in archive
+        assert archive.get(URL) == '<html>première version</html>'
+
+    def test_get_missing_link(self, tmp_path):
+        """Check if a link never archived is not found"""
+        archive = gn_html_archive.HtmlArchive(str(tmp_path))
+        assert archive.get(URL) is None
@@ -0,0 +1,51 @@
+"""
+Unit tests for CollectorScheduler module (offline: the collectors are fake).
+"""
+
+import time
+
+import gn_modules.scraping_and_extraction.collector_scheduler as gn_collector_scheduler
+
+
+def make_collector(name, delay, articles=None):
+    """Fake collector class scraping the given articles in delay seconds (failing if articles is None)"""
+
+    class FakeCollector():
+        NAME = name
+
+        def __init__(self, scraping_mode):
+            pass
+
+        def scrape_and_extract_articles_from_day_to(self, from_date, to_date, max, known_links_lookup=None):
+            time.sleep(delay)
+            if articles is None:
+                raise RuntimeError(f'{name} is down')
+            return articles
+
+    return FakeCollector
+
+
+class TestScrapeAndExtractArticlesFromDayTo():
+    """Test the report of scrape_and_extract_articles_from_day_to"""
+
+    def test_durations_exclude_handing_over(self):
+        """Check if the duration of a source does not include the handing over of the articles of the other sources"""
+        scheduler = gn_collector_scheduler.CollectorScheduler(
+            [make_collector('fast', 0.1, ['a']), make_collector('slow', 0.3, ['b', 'c']), make_collector('down', 0.2)], 'rss')
+        handed_over = []
+
+        def on_articles(source_name, articles):
+            handed_over.append(source_name)
+            time.sleep(0.5)
+
+        report = scheduler.scrape_and_extract_articles_from_day_to(None, None, on_articles)
+        assert handed_over == ['fast', 'slow']
+        assert report['slow']['articles'] == 2
+        assert report['down']['error'] == repr(RuntimeError('down is down'))
+        assert report['slow']['duration'] < 0.5
+        assert report['down']['duration'] < 0.5
+
+    def test_no_collector(self):
+        """Check if a scheduler without collector gives an empty report"""
+        scheduler = gn_collector_scheduler.CollectorScheduler([], 'rss')
+        assert scheduler.scrape_and_extract_articles_from_day_to(None, None, lambda source_name, articles: None) == {}
@@ -6,6 +6,7 @@ Unit tests for db_helper module.
 import copy
 import datetime as dt
 import pymongo as pm
+import bson
 
 import gn_modules.article as gn_article
 from gn_modules.category import Category
@@ -219,6 +220,13 @@ class TestGetArticles:
         res = DB_HELPER.get_article(self.article_test1)
         assert res
 
+    def test_get_existing_links(self):
+        """Check if we can get the links already stored"""
+
+        links = [self.article_test1.link, self.article_test2.link, 'unknown link']
+        existing_links = DB_HELPER.get_existing_links(links, batch_size=2)
+        assert existing_links == {self.article_test1.link, self.article_test2.link}
+
     def test_get_articles_never_processed(self):
         """Check if we can get never processed articles"""
 
@@ -307,3 +315,23 @@ class TestReExtractAndProcess:
         """Reset the database"""
 
         DB_HELPER.articles_collection.delete_many({})
+
+
+class TestReExtractCheckpoint:
+    """Test the checkpoint of re_extract_and_process_everything (no database needed)"""
+
+    def test_write_and_read(self, tmp_path):
+        """Check if the last checkpoint written is read back, without temporary file left"""
+
+        checkpoint_file = str(tmp_path / 'cache' / 'checkpoint.json')
+        first_id, last_id = bson.ObjectId(), bson.ObjectId()
+        gn_db_helper.DbHelper._write_checkpoint(checkpoint_file, first_id)
+        assert gn_db_helper.DbHelper._read_checkpoint(checkpoint_file) == first_id
+        gn_db_helper.DbHelper._write_checkpoint(checkpoint_file, last_id)
+        assert gn_db_helper.DbHelper._read_checkpoint(checkpoint_file) == last_id
+        assert [path.name for path in (tmp_path / 'cache').iterdir()] == ['checkpoint.json']
+
+    def test_read_missing_checkpoint(self, tmp_path):
+        """Check if there is no checkpoint when the file does not exist"""
+
+        assert gn_db_helper.DbHelper._read_checkpoint(str(tmp_path / 'checkpoint.json')) is None
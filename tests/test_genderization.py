@@ -0,0 +1,106 @@
+"""
+Unit tests for the genderization of the speakers.
+"""
+
+import re
+import types
+
+import gn_modules.processing.processings.quote_extractor.french_pipeline.genderization as gen
+
+
+def fake_nlp(doc):
+    """Stand-in for the stanza pipeline: returns the text(s) instead of their parse"""
+    if isinstance(doc, list):
+        return [document.text for document in doc]
+    return doc
+
+# Speakers and their (title gender, pronoun gender, speaker without titles), as given by the former
+# check_title, check_pronoun and remove_titles functions (the titles are found by the same pattern)
+MATCHED_SPEAKERS = [
+    ('Emmanuel Macron', (None, None, 'Emmanuel Macron')),
+    ('M. Dupont', (1, None, '. Dupont')),
+    ('M Martin', (1, None, 'Martin')),
+    ('Mme Marie Dupont', (0, None, 'Marie Dupont')),
+    ('Monsieur le Préfet', (1, None, 'le Préfet')),
+    ('Monsieur', (1, None, '')),
+    ('Sœur Marie', (0, None, 'Marie')),
+    ('Mlle Durand', (0, None, 'Durand')),
+    ('le Dr Martin', (None, None, 'le  Martin')),
+    ('il', (None, 1, 'il')),
+    ('Ils', (None, 1, 'Ils')),
+    ('lui', (None, 1, 'lui')),
+    ('elle', (None, 0, 'elle')),
+    # The pronoun is only matched at the start of the speaker
+    ('selon elle', (None, None, 'selon elle')),
+    ('Jean-Pierre Martin, maire de la ville', (None, None, 'Jean-Pierre Martin, maire de la ville')),
+]
+
+
+class TestMatchSpeaker():
+    """Test the title and pronoun rules of match_speaker"""
+
+    def test_match_speaker(self):
+        """Check if match_speaker gives the results of the former separate checks"""
+        for speaker, (title_gender, pron_gender, _) in MATCHED_SPEAKERS:
+            assert gen.match_speaker(speaker) == (title_gender, pron_gender), speaker
+
+    def test_check_title_and_pronoun(self):
+        """Check if check_title and check_pronoun agree with match_speaker"""
+        for speaker, (title_gender, pron_gender, _) in MATCHED_SPEAKERS:
+            assert gen.check_title(speaker) == title_gender, speaker
+            assert gen.check_pronoun(speaker) == pron_gender, speaker
+
+    def test_remove_titles(self):
+        """Check if remove_titles removes the titles found by match_speaker"""
+        for speaker, (_, _, name) in MATCHED_SPEAKERS:
+            assert gen.remove_titles(speaker) == name, speaker
+
+
+class TestSpeakerParseCache():
+    """Test the hits and misses of SpeakerParseCache"""
+
+    def test_distinct_speakers(self, monkeypatch):
+        """Check if the hit rate is 0 when no speaker is parsed twice"""
+        monkeypatch.setattr(gen, 'nlp', fake_nlp)
+        cache = gen.SpeakerParseCache()
+        speakers = ['Emmanuel Macron', 'la ministre', 'le maire']
+        cache.parse_all(speakers)
+        for speaker in speakers:
+            assert cache.parse(speaker) == speaker
+        assert cache.misses == 3
+        assert cache.hit_rate() == 0
+
+    def test_recurring_speakers(self, monkeypatch):
+        """Check if a speaker parsed for a previous article is a hit"""
+        monkeypatch.setattr(gen, 'nlp', fake_nlp)
+        cache = gen.SpeakerParseCache()
+        cache.parse_all(['le président'])
+        cache.parse_all(['le président'])
+        assert (cache.hits, cache.misses) == (1, 1)
+
+
+class TestGetSpeakerSpan():
+    """Test the words and entities of the article parse given to the checks of a speaker"""
+
+    @staticmethod
+    def make_doc():
+        """Parse-like doc of "le ministre Jean Dupont, selon Marie": one token per word"""
+        text = 'le ministre Jean Dupont, selon Marie'
+        tokens = []
+        for match in re.finditer(r'\w+|,', text):
+            word = types.SimpleNamespace(text=match.group(), upos='NOUN')
+            tokens.append(types.SimpleNamespace(start_char=match.start(), end_char=match.end(), words=[word]))
+        entities = [types.SimpleNamespace(text='Jean Dupont', type='PER', start_char=12, end_char=23),
+                    types.SimpleNamespace(text='Marie', type='PER', start_char=31, end_char=36)]
+        return types.SimpleNamespace(sentences=[types.SimpleNamespace(tokens=tokens)], entities=entities)
+
+    def test_entity_inside_span(self):
+        """Check if the words and the entity of the speaker are found"""
+        span = gen.get_speaker_span(self.make_doc(), (0, 23))
+        assert [word.text for word in span.words] == ['le', 'ministre', 'Jean', 'Dupont']
+        assert [ent.text for ent in span.entities] == ['Jean Dupont']
+
+    def test_entity_straddling_span(self):
+        """Check if an entity that is only partly in the span is not given to the speaker"""
+        span = gen.get_speaker_span(self.make_doc(), (0, 17))
+        assert span.entities == []
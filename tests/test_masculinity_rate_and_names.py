@@ -0,0 +1,103 @@
+"""
+Unit tests for MasculinityRateAndNames (offline: the texts of the articles are given).
+"""
+
+import math
+import random
+
+import faker
+import pytest
+
+import gn_modules.article as gn_article
+import gn_modules.processing.processings.masculinity_rate_and_names as masculinity
+
+
+MASCULINITY = masculinity.MasculinityRateAndNames()
+
+TEXTS = ["Selon Marie, l'entraîneur de Jean-Pierre a rencontré Anne et Paul.",
+         "Aucun prénom dans ce texte, seulement des mots en minuscules.",
+         "Camille et Dominique ont répondu à Marie, puis Camille est partie.",
+         ""]
+
+
+def make_articles(texts):
+    """Random articles whose texts are the given texts (nothing is downloaded)"""
+    fake = faker.Faker()
+    articles = []
+    for text in texts:
+        article = gn_article.Article.create_random_article(fake)
+        article._text = text
+        articles.append(article)
+    return articles
+
+
+def make_random_texts(number):
+    """Texts made of capitalized first names of the names list and of other words"""
+    rand = random.Random(0)
+    names = sorted(MASCULINITY.names_ratios)
+    texts = []
+    for _ in range(number):
+        words = [rand.choice(names).capitalize() if rand.random() < 0.3 else rand.choice(['le', 'dit', 'Paris', 'selon', ','])
+                 for _ in range(rand.randint(0, 30))]
+        texts.append(' '.join(words))
+    return texts
+
+
+def assert_same_processings(processings, expected_processings):
+    """Check the names and the masculinity rates (a NaN rate is equal to a NaN rate)"""
+    assert len(processings) == len(expected_processings)
+    for processing, expected in zip(processings, expected_processings):
+        assert processing[MASCULINITY.NAMES] == expected[MASCULINITY.NAMES]
+        assert processing[MASCULINITY.MASCULINITY_RATE] == pytest.approx(expected[MASCULINITY.MASCULINITY_RATE], nan_ok=True)
+
+
+class TestProcess():
+    """Test the vectorised process against process_text_one_article."""
+
+    def check(self, articles):
+        """Check if process gives the results of process_text_one_article on each article"""
+        assert_same_processings(MASCULINITY.process(articles),
+                                [MASCULINITY.process_text_one_article(article.get_text()) for article in articles])
+
+    def test_articles(self):
+        """Check articles with names, without names and without text"""
+        self.check(make_articles(TEXTS))
+        assert math.isnan(MASCULINITY.process(make_articles(TEXTS[1:2]))[0][MASCULINITY.MASCULINITY_RATE])
+
+    def test_empty_batch(self):
+        """Check if an empty batch gives no result"""
+        assert MASCULINITY.process([]) == []
+
+    def test_random_texts(self):
+        """Check generated texts"""
+        self.check(make_articles(make_random_texts(300)))
+
+
+class ConfiguredMasculinity(masculinity.MasculinityRateAndNames):
+    """Processing with a constructor argument, which its processings give back"""
+
+    def __init__(self, batch_size: int = None) -> None:
+        super().__init__()
+        self.batch_size = batch_size if batch_size else 1
+
+    def get_init_kwargs(self):
+        return {'batch_size': self.batch_size}
+
+    def process(self, articles):
+        return [{'batch_size': self.batch_size} for _ in articles]
+
+
+class TestProcessInParallel():
+    """Test process_in_parallel (Processing) with MasculinityRateAndNames."""
+
+    def test_same_as_process(self):
+        """Check if the results of the chunks processed in 2 processes are in the order of the articles"""
+        articles = make_articles(TEXTS + make_random_texts(50))
+        assert_same_processings(MASCULINITY.process_in_parallel(articles, n_jobs=2, chunksize=7),
+                                MASCULINITY.process(articles))
+
+    def test_constructor_arguments(self):
+        """Check if the processings of the worker processes are built with the constructor arguments"""
+        articles = make_articles(TEXTS)
+        processings = ConfiguredMasculinity(batch_size=3).process_in_parallel(articles, n_jobs=2, chunksize=1)
+        assert processings == [{'batch_size': 3}] * len(articles)
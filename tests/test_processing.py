@@ -2,9 +2,12 @@
 Unit tests for Processing
 """
 
+import tempfile
+
 import gn_modules.processing.processings.masculinity_rate_and_names as masculinity
 import gn_modules.processing.processings.homogenous_category as homogenous_category
 import gn_modules.scraping_and_extraction.collectors.le_monde as gn_le_monde
+import gn_modules.scraping_and_extraction.html_archive as gn_html_archive
 import gn_modules.processing.processings.quotes as quotes
 
 
@@ -13,6 +16,9 @@ HOMOGENOUS_CATEGORY = homogenous_category.HomogenousCategory()
 QUOTES = quotes.Quotes()
 
 LE_MONDE = gn_le_monde.LeMonde(scraping_mode='rss')
+# The html of the articles is archived in a temporary directory
+ARCHIVE_DIRECTORY = tempfile.TemporaryDirectory()
+LE_MONDE.archive = gn_html_archive.HtmlArchive(ARCHIVE_DIRECTORY.name)
 
 # Scrape and extract all articles of yesterday of Le Monde
 ARTICLES = LE_MONDE.scrape_and_extract_articles_of_yesterday()
@@ -21,6 +27,11 @@ ARTICLES = LE_MONDE.scrape_and_extract_articles_of_yesterday()
 TEXT = ARTICLES[0].get_text()
 
 
+def teardown_module():
+    """Remove the archived html."""
+    ARCHIVE_DIRECTORY.cleanup()
+
+
 class TestProcessTextOneArticle():
     """Test process_text_one_article method."""
 
@@ -68,3 +79,20 @@ class TestApplyOn():
         for list_articles in processes:
             for article in list_articles:
                 assert article.processings
+
+
+class TestNameMatcher():
+    """Test the NameMatcher of MasculinityRateAndNames."""
+
+    def test_find_names(self):
+        """Check if capitalized names are found with their positions, compound names as a whole."""
+        txt = "Selon Marie, l'entraîneur de Jean-Pierre marie la rose d'Anne."
+        names = MASCULINITY.name_matcher.find_names(txt)
+        assert [name for name, _, _ in names] == ['Marie', 'Jean-Pierre', 'Anne']
+        for name, start, end in names:
+            assert txt[start:end] == name
+
+    def test_names_indicator(self):
+        """Check if the extracted names are returned with the masculinity rate."""
+        res = MASCULINITY.process_text_one_article("Jean et Marie sont là.")
+        assert res[MASCULINITY.NAMES] == ['Jean', 'Marie']
@@ -0,0 +1,229 @@
+"""
+Unit tests for the helpers of the quote extractor (quote_extractor_fr_V2).
+"""
+
+import random
+import types
+
+import pytest
+
+import gn_modules.processing.processings.quote_extractor.french_pipeline.quote_extractor_fr_V2 as qe
+
+# Sentences (number, text) indexed by their start character
+SENTENCES = qe.PositionIndex({0: (0, 'Première phrase.'), 17: (1, 'Deuxième phrase.'), 34: (2, 'Troisième.')})
+# Pronouns indexed by their start character
+PRONOUNS = qe.PositionIndex({40: 'il', 5: 'elle', 22: 'lui'})
+
+
+class TestPositionIndex():
+    """Test the lookups of the positions before or after a character"""
+
+    def test_positions_sorted(self):
+        """Check if the positions are sorted whatever the order of the items"""
+        assert PRONOUNS.positions == [5, 22, 40]
+
+    def test_get_sentence_number(self):
+        """Check if the sentence of a character is the last one starting before or at it"""
+        assert qe.getSentenceNumber(SENTENCES, 0) == (0, 'Première phrase.')
+        assert qe.getSentenceNumber(SENTENCES, 16) == (0, 'Première phrase.')
+        assert qe.getSentenceNumber(SENTENCES, 17) == (1, 'Deuxième phrase.')
+        assert qe.getSentenceNumber(SENTENCES, 100) == (2, 'Troisième.')
+
+    def test_get_sentence_number_before_first(self):
+        """Check if a character before the first sentence fails"""
+        with pytest.raises(AssertionError):
+            qe.getSentenceNumber(qe.PositionIndex({3: (0, '')}), 2)
+
+    def test_get_closest_preceding(self):
+        """Check if the closest position before or at a character is found (-1 if there is none)"""
+        assert qe.getClosestPreceding(PRONOUNS, 22) == 22
+        assert qe.getClosestPreceding(PRONOUNS, 39) == 22
+        assert qe.getClosestPreceding(PRONOUNS, 4) == -1
+
+    def test_get_closest_following(self):
+        """Check if the closest position after or at a character is found (-1 if there is none)"""
+        assert qe.getClosestFollowing(PRONOUNS, 22) == 22
+        assert qe.getClosestFollowing(PRONOUNS, 23) == 40
+        assert qe.getClosestFollowing(PRONOUNS, 41) == -1
+        assert qe.getClosestFollowing(qe.PositionIndex(), 0) == -1
+
+
+def legacy_get_children(sent=None, head=None, children_list=None):
+    """ The former recursive get_children, reference of the ChildrenIndex"""
+    if head not in children_list:
+      children_list.append(head)
+    for tok in sent.tokens:
+      if len(tok.words) == 1:
+        if tok.words[0].head in head.id:
+          legacy_get_children(sent,tok,children_list)
+      elif len(tok.words) > 1: #If token is composed of several words:
+        heads = set([w.head for w in tok.words if w.head not in tok.id])
+        ids = set(head.id)
+        if len(ids.intersection(heads)) > 0 and tok not in children_list:
+          legacy_get_children(sent,tok,children_list)
+      else:
+        pass
+    #removing unwanted punctuation at the start of the tree
+    try:
+      for i in range(0,len(children_list)-1):
+        while children_list[i].text in [".",",",":","?","!",";",")"]:
+          del children_list[i]
+      return sorted(children_list, key=lambda x: x.id)
+    except IndexError:
+        return sorted(children_list, key=lambda x: x.id)
+
+
+class Sentence():
+    """Parse-like sentence (hashable, as the stanza sentences)"""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+
+
+def make_sentence(tokens):
+    """Sentence of the tokens given as (text, heads of its words): the words are numbered from 1"""
+    sent_tokens = []
+    word_id = 1
+    for text, heads in tokens:
+        ids = tuple(range(word_id, word_id + len(heads)))
+        words = [types.SimpleNamespace(id=i, head=head) for i, head in zip(ids, heads)]
+        sent_tokens.append(types.SimpleNamespace(id=ids, text=text, words=words))
+        word_id += len(heads)
+    return Sentence(sent_tokens)
+
+
+def make_random_sentence(rand):
+    """Random dependency tree with multiword tokens and punctuation tokens"""
+    sizes = [rand.choice([1, 1, 1, 2]) for _ in range(rand.randint(1, 12))]
+    n_words = sum(sizes)
+    order = list(range(1, n_words + 1))
+    rand.shuffle(order)
+    heads = {order[0]: 0}
+    for k, word in enumerate(order[1:], 1):
+        heads[word] = rand.choice(order[:k])
+    tokens = []
+    word_id = 1
+    for size in sizes:
+        text = 'du' if size > 1 else rand.choice(['mot', 'mot', ',', '.', ')'])
+        tokens.append((text, [heads[i] for i in range(word_id, word_id + size)]))
+        word_id += size
+    return make_sentence(tokens)
+
+
+class TestGetChildren():
+    """Test the subtrees of get_children against the former recursive get_children"""
+
+    @staticmethod
+    def check_all_heads(sent):
+        """Check the subtree of every token of the sentence"""
+        context = types.SimpleNamespace(children_indices={sent: qe.ChildrenIndex(sent)})
+        for head in sent.tokens:
+            assert qe.get_children(context, sent, head) == legacy_get_children(sent, head, [])
+
+    def test_multiword_token(self):
+        """Check a sentence with a multiword token ("du" = "de le") attached to the verb"""
+        # "Il parle du projet ." : "de" depends on "projet", "le" on "projet", "projet" on "parle"
+        self.check_all_heads(make_sentence([('Il', [2]), ('parle', [0]), ('du', [5, 5]), ('projet', [2]), ('.', [2])]))
+
+    def test_punctuation_at_the_end(self):
+        """Check a sentence whose last token is a punctuation token of the subtree"""
+        sent = make_sentence([('Il', [2]), ('parle', [0]), ('vite', [2]), ('.', [2])])
+        self.check_all_heads(sent)
+        context = types.SimpleNamespace(children_indices={sent: qe.ChildrenIndex(sent)})
+        assert [tok.text for tok in qe.get_children(context, sent, sent.tokens[1])] == ['Il', 'parle', 'vite', '.']
+
+    def test_punctuation_in_the_middle(self):
+        """Check a sentence with punctuation tokens inside the subtree"""
+        sent = make_sentence([('Marie', [4]), (',', [1]), ('ministre', [1]), ('dit', [0]), (',', [4]), ('oui', [4]), ('.', [4])])
+        self.check_all_heads(sent)
+        context = types.SimpleNamespace(children_indices={sent: qe.ChildrenIndex(sent)})
+        assert [tok.text for tok in qe.get_children(context, sent, sent.tokens[0])] == ['Marie', 'ministre']
+
+    def test_random_trees(self):
+        """Check random trees with multiword tokens and punctuation"""
+        rand = random.Random(0)
+        for _ in range(2000):
+            self.check_all_heads(make_random_sentence(rand))
+
+
+def legacy_seen_before(regex_match, quote_objects):
+    """ The former set-based seenBefore, on the stored (string) indices, reference of the QuoteIntervals"""
+    quotations = set([eval(quote_obj['quote_index']) for quote_obj in quote_objects])
+    for q in quotations:
+        indx1_set = set(range(regex_match.start(), regex_match.end()))
+        indx2_set = set(range(int(q[0]), int(q[1])))
+        if len(indx1_set.intersection(indx2_set)) / len(indx1_set.union(indx2_set)) > 0.3:
+            return True
+    return False
+
+
+def make_match(start, end):
+    """Regex-like match of the characters [start, end)"""
+    return types.SimpleNamespace(start=lambda: start, end=lambda: end)
+
+
+class TestSeenBefore():
+    """Test seenBefore against the former set-based fuzzy_match"""
+
+    QUOTES = [(10, 20), (30, 60), (100, 104)]
+
+    def check(self, start, end, quotes=None):
+        """Check if seenBefore agrees with the former version on the span (start, end), and return it"""
+        quotes = self.QUOTES if quotes is None else quotes
+        quote_intervals = qe.QuoteIntervals([{'quote_index': qe.CharOffsets(*quote)} for quote in quotes])
+        stored_quotes = qe.format_indices([{'quote_index': qe.CharOffsets(*quote), 'verb_index': '', 'speaker_index': ''}
+                                           for quote in quotes])
+        seen = qe.seenBefore(make_match(start, end), quote_intervals)
+        assert seen == legacy_seen_before(make_match(start, end), stored_quotes)
+        return seen
+
+    def test_overlapping(self):
+        """Check spans sharing more or less than 30% of their characters with a quote"""
+        assert self.check(15, 25)
+        assert not self.check(18, 28)
+        assert self.check(25, 50)
+
+    def test_adjacent(self):
+        """Check spans ending where a quote starts or starting where it ends"""
+        assert not self.check(20, 30)
+        assert not self.check(60, 70)
+        assert not self.check(0, 10)
+
+    def test_nested(self):
+        """Check spans inside a quote or containing a quote"""
+        assert self.check(35, 50)
+        assert not self.check(40, 45)
+        assert self.check(5, 25)
+        assert not self.check(0, 120)
+
+    def test_disjoint(self):
+        """Check spans far from every quote, and a document without quotes"""
+        assert not self.check(70, 90)
+        assert not self.check(200, 300)
+        assert not self.check(10, 20, quotes=[])
+
+    def test_random_intervals(self):
+        """Check random spans against random quotes"""
+        rand = random.Random(0)
+        for _ in range(2000):
+            quotes = []
+            for _ in range(rand.randint(0, 6)):
+                start = rand.randint(0, 100)
+                quotes.append((start, start + rand.randint(1, 40)))
+            start = rand.randint(0, 100)
+            self.check(start, start + rand.randint(1, 40), quotes)
+
+
+class TestFormatIndices():
+    """Test the stored format of the indices"""
+
+    def test_char_offsets(self):
+        """Check if the indices of the regex stages are stored without space"""
+        assert str(qe.CharOffsets(3, 12)) == '(3,12)'
+        assert qe.CharOffsets(3, 12) == (3, 12)
+
+    def test_format_indices(self):
+        """Check if the indices of the tokens keep the space of the tuples, and empty indices are kept"""
+        tokens = [types.SimpleNamespace(start_char=5, end_char=9), types.SimpleNamespace(start_char=10, end_char=14)]
+        quote_obj = {'quote_index': qe.CharOffsets(20, 42), 'verb_index': '', 'speaker_index': qe.get_pretty_index(tokens)}
+        assert qe.format_indices([quote_obj]) == [{'quote_index': '(20,42)', 'verb_index': '', 'speaker_index': '(5, 14)'}]
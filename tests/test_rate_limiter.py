@@ -0,0 +1,32 @@
+"""
+Unit tests for the rate limiter
+"""
+
+import time
+
+import gn_modules.rate_limiter as gn_rate_limiter
+
+
+class TestDomainRateLimiter():
+    """Test the DomainRateLimiter class."""
+
+    def test_burst_is_not_delayed(self):
+        """Check if the requests within the capacity are not delayed."""
+        rate_limiter = gn_rate_limiter.DomainRateLimiter(rate=1, capacity=3)
+        for _ in range(3):
+            assert rate_limiter.acquire('https://www.lemonde.fr/a') == 0
+
+    def test_requests_are_delayed(self):
+        """Check if the requests beyond the capacity wait for a token."""
+        rate_limiter = gn_rate_limiter.DomainRateLimiter(rate=20, capacity=1)
+        start = time.monotonic()
+        for _ in range(3):
+            rate_limiter.acquire('https://www.lemonde.fr/a')
+        assert time.monotonic() - start >= 0.09
+
+    def test_domains_are_independent(self):
+        """Check if a domain is not delayed by the requests to another domain."""
+        rate_limiter = gn_rate_limiter.DomainRateLimiter(rate=5, capacity=1)
+        assert rate_limiter.acquire('https://www.lemonde.fr/a') == 0
+        assert rate_limiter.acquire('https://www.lefigaro.fr/a') == 0
+        assert rate_limiter.acquire('https://WWW.LEMONDE.FR/b') > 0
@@ -3,8 +3,12 @@ Unit tests for RSS_source module.
 """
 
 import datetime as dt
+import time
+import threading
+import http.server
 
 import gn_modules.scraping_and_extraction.rss_source as gn_rss_source
+import gn_modules.scraping_and_extraction.feed_cache as gn_feed_cache
 
 
 MONDE_ACTUALITE = 'https://www.lemonde.fr/actualite-en-continu/rss_full.xml'
@@ -132,3 +136,79 @@ class TestGetEntriesOfYesterday:
         entries = MONDE.get_entries_of_yesterday()
         for entry in entries:
             assert entry['date'].date() == yesterday.date()
+
+
+class TestFeedCache:
+    """Test the FeedCache used by the RssSource."""
+
+    def test_set_and_get(self, tmp_path):
+        """Check if the validators and the entries of a feed are stored."""
+        feed_cache = gn_feed_cache.FeedCache(str(tmp_path))
+        entries = [{'link': 'https://www.lemonde.fr/article.html',
+                    'date': dt.datetime(2021, 3, 10, 12, 30)}]
+        feed_cache.set(MONDE_ACTUALITE, '"etag"', 'Wed, 10 Mar 2021 12:30:00 GMT', entries)
+        cached = feed_cache.get(MONDE_ACTUALITE)
+        assert cached['etag'] == '"etag"'
+        assert cached['modified'] == 'Wed, 10 Mar 2021 12:30:00 GMT'
+        assert cached['entries'] == entries
+
+    def test_directory_created_on_first_set(self, tmp_path):
+        """Check if the cache directory is only created when a feed is stored."""
+        directory = tmp_path / 'rss_feeds'
+        feed_cache = gn_feed_cache.FeedCache(str(directory))
+        assert feed_cache.get(MONDE_ACTUALITE) is None
+        assert not directory.exists()
+        feed_cache.set(MONDE_ACTUALITE, None, None, [])
+        assert directory.is_dir()
+
+    def test_get_missing_feed(self, tmp_path):
+        """Check if a feed never cached is not found."""
+        feed_cache = gn_feed_cache.FeedCache(str(tmp_path))
+        assert feed_cache.get(MONDE_ACTUALITE) is None
+
+
+RSS_FEED = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>Fast feed</title>
+<item><title>Article</title><link>http://127.0.0.1/article.html</link>
+<pubDate>Wed, 10 Mar 2021 12:30:00 GMT</pubDate></item>
+</channel></rss>"""
+
+
+class _FeedHandler(http.server.BaseHTTPRequestHandler):
+    """Serve RSS_FEED, after 2 seconds on /slow."""
+
+    def do_GET(self):
+        if self.path == '/slow':
+            time.sleep(2)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/rss+xml')
+        self.end_headers()
+        self.wfile.write(RSS_FEED)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestSlowFeed:
+    """Test scrape_all_xml when a feed times out (offline, local HTTP server)."""
+
+    @classmethod
+    def setup_class(cls):
+        """Start the local HTTP server."""
+        cls.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _FeedHandler)
+        cls.server.daemon_threads = True
+        cls.url = f'http://127.0.0.1:{cls.server.server_address[1]}'
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def teardown_class(cls):
+        """Stop the local HTTP server."""
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_slow_feed_ignored(self, tmp_path):
+        """Check if the entries of the other feeds are kept when a feed times out."""
+        source = gn_rss_source.RssSource([self.url + '/slow', self.url + '/fast'], 'Local',
+                                         feed_timeout=0.5, feed_cache=gn_feed_cache.FeedCache(str(tmp_path)))
+        entries = source.scrape_all_xml()
+        assert [entry['link'] for entry in entries] == ['http://127.0.0.1/article.html']
@@ -0,0 +1,33 @@
+"""
+Unit tests for the text_normalization module.
+"""
+
+import gn_modules.processing.text_normalization as gn_text_normalization
+
+# Texts, normalize_txt arguments and normalized texts, as given by the former normalize_txt
+NORMALIZED_TEXTS = [
+    ('Voir www.lemonde.fr/article et http://x.fr/a?b=1 ici', {}, 'Voir et ici'),
+    ("Un <a href='x'>lien</a> et fin/>", {}, "Un href='x'>lien et "),
+    ('mot/> reste', {}, ' reste'),
+    ("Trop   d'espaces\r\n\tet\fpage", {}, "Trop d'espaces\n\tet page"),
+    ("Trop   d'espaces\r\n\tet\fpage", {'rm_new_lines': True}, "Trop d'espaceset page"),
+    ('Élève Café', {'lower': True}, 'élève café'),
+]
+
+
+class TestNormalizeTxt():
+    """Test normalize_txt function"""
+
+    def test_normalize_txt(self):
+        """Check if URLs, whitespace characters, multiple spaces and case are normalized"""
+        for txt, kwargs, expected in NORMALIZED_TEXTS:
+            assert gn_text_normalization.normalize_txt(txt, **kwargs) == expected, txt
+
+    def test_normalize_bytes(self):
+        """Check if bytes are decoded"""
+        assert gn_text_normalization.normalize_txt('Café'.encode('utf-8')) == 'Café'
+
+    def test_replace_all(self):
+        """Check if the replacements are applied in order"""
+        replacements = gn_text_normalization.SPACE_AND_QUOTES_REPLACEMENTS
+        assert gn_text_normalization.replace_all('\xa0“oui”', replacements) == ' "oui"'